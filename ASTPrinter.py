@@ -2,12 +2,14 @@ from typing import List, Union
 
 import loxExprAST
 import loxStmtAST
+import loxnumber
 import loxtoken
 
 
 class ASTStmtPrinter(loxStmtAST.Visitor):
 
-    INDENT: int = 0     # Indent for statement blocks
+    def __init__(self) -> None:
+        self.indent: int = 0  # indent for statement blocks, kept per printer
 
     def print(self, stmt: Union[loxStmtAST.Stmt, List[loxStmtAST.Stmt]]) -> str:
         """ Print statement or list of statements """
@@ -18,26 +20,20 @@ class ASTStmtPrinter(loxStmtAST.Visitor):
                 return stmt.accept(self)
         return ""
 
-    @staticmethod
-    def print_list(stmt: List[loxStmtAST.Stmt]) -> str:
+    def print_list(self, stmt: List[loxStmtAST.Stmt]) -> str:
         """ Print list of statements with indent """
-        print_st: str = "\n" + ASTStmtPrinter.INDENT * ' ' + "Start List ===\n"
-        if ASTStmtPrinter.INDENT != 0:
-            ASTStmtPrinter.INDENT = int(ASTStmtPrinter.INDENT * 2)
-        else:
-            ASTStmtPrinter.INDENT = 4
-        if stmt:
-            for st in stmt:
-                print_st += ASTStmtPrinter.INDENT * ' ' + ASTStmtPrinter().print(st) + "\n"
-            if ASTStmtPrinter.INDENT != 4:
-                ASTStmtPrinter.INDENT = int(ASTStmtPrinter.INDENT / 2)
-            else:
-                ASTStmtPrinter.INDENT = 0
-            return print_st + ASTStmtPrinter.INDENT * ' ' + "End List ===\n"
-        return ""
+        if not stmt:
+            return ""
+        enclosing: int = self.indent
+        print_st: str = "\n" + enclosing * ' ' + "Start List ===\n"
+        self.indent = enclosing * 2 if enclosing != 0 else 4
+        for st in stmt:
+            print_st += self.indent * ' ' + self.print(st) + "\n"
+        self.indent = enclosing
+        return print_st + enclosing * ' ' + "End List ===\n"
 
     def visit_block_stmt(self, stmt: loxStmtAST.Block) -> str:
-        return "\n" + stmt.__class__.__name__ + ASTStmtPrinter().print(stmt.statements)
+        return "\n" + stmt.__class__.__name__ + self.print(stmt.statements)
 
     def visit_class_stmt(self, stmt: loxStmtAST.Class) -> str:
         super_class: str = ""
@@ -58,12 +54,12 @@ class ASTStmtPrinter(loxStmtAST.Visitor):
         parameters: str = ""
         for par in stmt.params:
             parameters = parameters + par.lexeme + " "
-        return stmt.__class__.__name__ + " " + stmt.name.lexeme + " " + parameters + " " + ASTStmtPrinter().print(
+        return stmt.__class__.__name__ + " " + stmt.name.lexeme + " " + parameters + " " + self.print(
             stmt.body)
 
     def visit_if_stmt(self, stmt: loxStmtAST.If) -> str:
-        return stmt.__class__.__name__ + " " + ASTPrinter().print(stmt.condition) + ASTStmtPrinter().print(
-            stmt.then_branch) + ASTStmtPrinter().print(stmt.else_branch)
+        return stmt.__class__.__name__ + " " + ASTPrinter().print(stmt.condition) + self.print(
+            stmt.then_branch) + self.print(stmt.else_branch)
 
     def visit_while_stmt(self, stmt: loxStmtAST.While) -> str:
         return stmt.__class__.__name__ + " " + ASTPrinter().print(stmt.condition) + self.visit_block_stmt(
@@ -122,6 +118,8 @@ class ASTPrinter(loxExprAST.Visitor):
     def visit_literal_expr(self, expr: loxExprAST.Literal) -> str:
         if expr.value is None:
             return "None"
+        if type(expr.value) is int:
+            return loxnumber.to_string(expr.value)
         return str(expr.value)
 
     def visit_unary_expr(self, expr: loxExprAST.Unary) -> str:
@@ -0,0 +1,55 @@
+""" Requests per second of a small script run through the embedding API
+    Compares compiling once and running the program per request against
+    compiling on every request
+
+    python benchmark/embed.py [requests] """
+
+import io
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pylox  # noqa: E402
+
+SCRIPT = """fun price(item) {
+  var total = item.get("price") * item.get("qty");
+  if (total > 100) total = total * 0.9;
+  return total;
+}
+var sum = 0;
+for (var i = 0; i < order.length(); i = i + 1) {
+  sum = sum + price(order.get(i));
+}
+print sum;
+"""
+
+
+def order(request: int) -> List[dict]:
+    """ Return globals of one request """
+    return [{"price": (request + i) % 50, "qty": i + 1} for i in range(5)]
+
+
+def requests_per_second(count: int, compile_each: bool) -> float:
+    """ Serve count requests, return rate """
+    program = pylox.compile(SCRIPT)
+    start: float = time.perf_counter()
+    for request in range(count):
+        if compile_each:
+            program = pylox.compile(SCRIPT)
+        program.run(globals={"order": order(request)}, stdout=io.StringIO())
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    count: int = int(args[0]) if args else 2000
+    print(f"compile per request: {requests_per_second(count, True):8.0f} req/s")
+    print(f"compile once:        {requests_per_second(count, False):8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+""" Overhead of fuel metering on the standard benchmarks
+    Runs each script with metering off, with a step limit that is never reached,
+    and with a scheduler called every 1000 steps, reporting the best CPU time of a few runs.
+    Memoisation is off so that every call is really made
+
+    python benchmark/fuel.py [repeats] """
+
+import io
+import os
+import sys
+import time
+from typing import Dict, List
+
+DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DIRECTORY, ".."))
+
+import loxprogram  # noqa: E402
+
+SCRIPTS: List[str] = ["fib", "method_call", "invocation", "closures", "instances", "nested_scopes",
+                      "arithmetic", "string_build"]
+
+MODES: Dict[str, Dict[str, object]] = {"off": {},
+                                       "limit": {"max_steps": 10 ** 15},
+                                       "sliced": {"on_slice": lambda: None, "slice_steps": 1000}}
+
+
+def best_times(program: loxprogram.Program, repeats: int) -> List[float]:
+    """ Return shortest run time of program in seconds for each mode
+        Modes take turns, starting with a different one each round, so neither a slower
+        stretch of the machine nor going first favours any of them """
+    options: List[Dict[str, object]] = list(MODES.values())
+    times: List[List[float]] = [[] for _ in MODES]
+    for repeat in range(repeats):
+        for turn in range(len(options)):
+            mode: int = (repeat + turn) % len(options)
+            start: float = time.process_time()
+            program.run(stdout=io.StringIO(), memoize=False, **options[mode])
+            times[mode].append(time.process_time() - start)
+    return [min(mode_times) for mode_times in times]
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    repeats: int = int(args[0]) if args else 5
+    print(f"{'script':15}" + "".join(f"{mode:>10}" for mode in MODES) + "   overhead")
+    for name in SCRIPTS:
+        with open(os.path.join(DIRECTORY, name + ".lox")) as source:
+            program = loxprogram.compile(source.read())
+        times: List[float] = best_times(program, repeats)
+        overheads: str = " ".join(f"{(t / times[0] - 1) * 100:+5.1f}%" for t in times[1:])
+        print(f"{name:15}" + "".join(f"{t:9.2f}s" for t in times) + "   " + overheads)
+
+
+if __name__ == "__main__":
+    main()
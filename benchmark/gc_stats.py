@@ -0,0 +1,72 @@
+""" Report environment allocations and garbage collector pauses
+    while running a Lox script
+
+    python benchmark/gc_stats.py script.lox """
+
+import contextlib
+import gc
+import io
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import loxenvironment  # noqa: E402
+import loxmain  # noqa: E402
+
+
+class Stats:
+    """ Counts environment allocations and times collections """
+
+    def __init__(self) -> None:
+        self.allocations: Dict[str, int] = dict()
+        self.collections: List[int] = [0, 0, 0]
+        self.pause: float = 0.0
+        self.started: float = 0.0
+
+    def count_allocations(self, cls: type) -> None:
+        """ Wrap __init__ of environment class to count instances created """
+        init = cls.__init__
+        self.allocations[cls.__name__] = 0
+
+        def counting_init(env, *args, **kwargs) -> None:
+            self.allocations[cls.__name__] += 1
+            init(env, *args, **kwargs)
+
+        cls.__init__ = counting_init
+
+    def gc_callback(self, phase: str, info: Dict[str, int]) -> None:
+        """ Time each collection """
+        if phase == "start":
+            self.started = time.perf_counter()
+        else:
+            self.pause += time.perf_counter() - self.started
+            self.collections[info["generation"]] += 1
+
+
+def main() -> None:
+    """ Main function """
+    if len(sys.argv) != 2:
+        print("Usage: gc_stats.py script.lox")
+        sys.exit(1)
+    stats = Stats()
+    for name in dir(loxenvironment):
+        if name.endswith("Environment"):
+            stats.count_allocations(getattr(loxenvironment, name))
+    gc.callbacks.append(stats.gc_callback)
+    output = io.StringIO()
+    start: float = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        loxmain.Lox([sys.argv[1]])
+    elapsed: float = time.perf_counter() - start
+    gc.callbacks.remove(stats.gc_callback)
+    for name, count in stats.allocations.items():
+        print(f"{name} allocations: {count}")
+    print(f"gc collections (gen 0/1/2): {stats.collections[0]}/{stats.collections[1]}/{stats.collections[2]}")
+    print(f"gc pause: {stats.pause * 1000:.1f} ms of {elapsed * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
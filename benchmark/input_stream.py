@@ -0,0 +1,66 @@
+""" Compare reading data with openFile against embedding it as literals
+    Sums the same numbers both ways and reports the time of each,
+    scanning and parsing included
+
+    python benchmark/input_stream.py [count] """
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import loxmain  # noqa: E402
+
+STREAM_SCRIPT = """var string = load("string");
+var input = openFile("{path}");
+var total = 0;
+var line = input.readLine();
+while (line != nil) {{
+  total = total + string.toNumber(line);
+  line = input.readLine();
+}}
+print total;
+"""
+
+
+def embedded_script(numbers: List[int]) -> str:
+    """ Return script with numbers as literals """
+    lines: List[str] = ["var total = 0;"]
+    lines.extend(f"total = total + {number};" for number in numbers)
+    lines.append("print total;")
+    return "\n".join(lines)
+
+
+def run(source: str) -> float:
+    """ Run script, return elapsed seconds """
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as script:
+        script.write(source)
+    start: float = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        loxmain.Lox([script.name])
+    elapsed: float = time.perf_counter() - start
+    os.unlink(script.name)
+    print("  result", output.getvalue().strip().splitlines()[-1])
+    return elapsed
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    count: int = int(args[0]) if args else 20000
+    numbers: List[int] = list(range(count))
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as data:
+        data.write("\n".join(map(str, numbers)) + "\n")
+    print(f"embedded literals: {run(embedded_script(numbers)):.2f} s")
+    print(f"streamed input:    {run(STREAM_SCRIPT.format(path=data.name)):.2f} s")
+    os.unlink(data.name)
+
+
+if __name__ == "__main__":
+    main()
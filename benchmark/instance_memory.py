@@ -0,0 +1,45 @@
+""" Measure memory used per LoxInstance
+    Creates instances of a class with a given number of fields
+    and reports traced bytes per instance
+
+    python benchmark/instance_memory.py [instances] [fields] """
+
+import os
+import sys
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import loxclass  # noqa: E402
+import loxtoken  # noqa: E402
+
+
+def measure(count: int, fields: int) -> float:
+    """ Return bytes per instance for count instances with fields fields """
+    klass = loxclass.LoxClass("Point", None)
+    names: List[loxtoken.Token] = [loxtoken.Token(loxtoken.TokenType.IDENTIFIER, f"f{i}", None, 1)
+                                   for i in range(fields)]
+    tracemalloc.start()
+    instances: List[loxclass.LoxInstance] = []
+    for n in range(count):
+        instance = loxclass.LoxInstance(klass)
+        for name in names:
+            instance.set(name, float(n))
+        instances.append(instance)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Floats and the list holding the instances are the same for any layout
+    return (size - count * fields * sys.getsizeof(1.0) - sys.getsizeof(instances)) / count
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    count: int = int(args[0]) if args else 1000000
+    for fields in ([int(args[1])] if len(args) > 1 else [1, 2, 4, 8]):
+        print(f"{count} instances, {fields} fields: {measure(count, fields):.1f} bytes per instance")
+
+
+if __name__ == '__main__':
+    main()
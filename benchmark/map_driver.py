@@ -0,0 +1,59 @@
+""" Time the --map driver over generated JSON lines
+    Compares one warm interpreter for every record against starting a new
+    interpreter per record, which is what a shell loop around pylox.py does
+
+    python benchmark/map_driver.py [count] """
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SCRIPT = """fun transform(record) {
+  var result = Map();
+  result.set("id", record.get("id"));
+  result.set("total", record.get("price") * record.get("qty"));
+  result.set("label", record.get("name") + "-x");
+  return result;
+}
+"""
+
+
+def records(count: int) -> str:
+    """ Return count records as JSON lines """
+    lines: List[str] = [json.dumps({"id": i, "price": i % 100 / 4, "qty": i % 7, "name": f"item{i}"})
+                        for i in range(count)]
+    return "\n".join(lines) + "\n"
+
+
+def run(script: str, data: str) -> float:
+    """ Run driver over data, return elapsed seconds """
+    start: float = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "pylox.py"), "--map", script, "--fn", "transform"],
+                            input=data, capture_output=True, text=True, check=True)
+    elapsed: float = time.perf_counter() - start
+    assert result.stdout.count("\n") == data.count("\n"), result.stderr
+    return elapsed
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    count: int = int(args[0]) if args else 100000
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as script:
+        script.write(SCRIPT)
+    cold_count: int = min(count, 20)
+    cold: float = sum(run(script.name, records(1)) for _ in range(cold_count)) / cold_count
+    warm: float = run(script.name, records(count))
+    os.unlink(script.name)
+    print(f"process per record: {1 / cold:10.0f} records/s")
+    print(f"warm driver:        {count / warm:10.0f} records/s ({count} records, {warm:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+""" Start up from a prelude image against running the prelude every time
+    Generates a prelude of classes, helper functions and constant tables built by loops,
+    then times runs of a short script that uses it: compiled with the prelude source and
+    run from scratch, against compiled with the image and started from its globals.
+    Also times writing the image and loading it from file
+
+    python benchmark/prelude_image.py [classes] [runs] """
+
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import loximage  # noqa: E402
+import loxprogram  # noqa: E402
+
+SCRIPT: str = "print Shape0(3).area() + helper0(4) + squares.get(99);"
+
+
+def prelude(classes: int) -> str:
+    """ Return prelude source with classes classes and as many helper functions """
+    lines: List[str] = []
+    for number in range(classes):
+        lines.append(f"class Shape{number} {{ init(size) {{ this.size = size; }} "
+                     f"area() {{ return this.size * this.size + {number}; }} "
+                     f"grow(by) {{ this.size = this.size + by; return this; }} "
+                     f"describe() {{ return \"shape {number}\"; }} }}")
+        lines.append(f"fun helper{number}(x) {{ return x * {number} + 1; }}")
+        lines.append(f"var default{number} = Shape{number}({number});")
+    lines.append("var squares = List();")
+    lines.append("for (var i = 0; i < 2000; i = i + 1) squares.append(i * i);")
+    lines.append("var names = Map();")
+    lines.append("for (var i = 0; i < 2000; i = i + 1) names.set(i, i + 1);")
+    return "\n".join(lines)
+
+
+def timings(function: Callable[[], object], runs: int) -> List[float]:
+    """ Return wall time in ms of each call of function """
+    times: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(name: str, times: List[float]) -> None:
+    """ Print median and spread of times """
+    print(f"{name:26} median {statistics.median(times):8.2f} ms   min {min(times):8.2f} ms   "
+          f"max {max(times):8.2f} ms")
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    classes: int = int(args[0]) if args else 200
+    runs: int = int(args[1]) if len(args) > 1 else 20
+    source: str = prelude(classes)
+    path: str = os.path.join(tempfile.mkdtemp(), "prelude.img")
+
+    def from_source() -> None:
+        loxprogram.compile(source + "\n" + SCRIPT).run(stdout=io.StringIO())
+
+    def from_image() -> None:
+        loxprogram.compile(SCRIPT, image=image).run(stdout=io.StringIO())
+
+    start: float = time.perf_counter()
+    image = loximage.snapshot(source)
+    image.save(path)
+    print(f"prelude of {classes} classes, image {os.path.getsize(path) // 1024} KB "
+          f"written in {(time.perf_counter() - start) * 1000:.1f} ms")
+    report("load image file", timings(lambda: loximage.load(path), runs))
+    report("compile and run prelude", timings(from_source, runs))
+    report("compile and run on image", timings(from_image, runs))
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    main()
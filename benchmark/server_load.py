@@ -0,0 +1,88 @@
+""" Load client for loxserver.py
+    Sends requests from many connections at once and reports p50/p99 latency and
+    requests per second. Starts its own server on a temporary Unix socket unless
+    one is given
+
+    python benchmark/server_load.py [--socket path] [--connections n] [--requests n] [--workers n] """
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SCRIPT = """fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+var result = fib(n);
+print result;
+"""
+
+
+async def client(socket: str, requests: int, latencies: List[float], failures: List[str]) -> None:
+    """ Send requests one after another on one connection """
+    reader, writer = await asyncio.open_unix_connection(socket)
+    for request_id in range(requests):
+        start: float = time.perf_counter()
+        writer.write(json.dumps({"id": request_id, "source": SCRIPT, "globals": {"n": 10}}).encode() + b"\n")
+        await writer.drain()
+        while True:
+            message = json.loads(await reader.readline())
+            if "status" in message:
+                break
+        latencies.append(time.perf_counter() - start)
+        if message["status"] != "ok":
+            failures.append(message["status"])
+    writer.close()
+
+
+async def wait_for_socket(path: str) -> None:
+    """ Wait until server accepts connections """
+    for _ in range(200):
+        try:
+            _, writer = await asyncio.open_unix_connection(path)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("Server did not start.")
+
+
+async def main(options: argparse.Namespace) -> None:
+    """ Main function """
+    server = None
+    socket: str = options.socket
+    if socket is None:
+        socket = os.path.join(tempfile.mkdtemp(), "lox.sock")
+        server = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(ROOT, "loxserver.py"), "--socket", socket,
+            "--workers", str(options.workers), stderr=asyncio.subprocess.DEVNULL)
+    await wait_for_socket(socket)
+    latencies: List[float] = []
+    failures: List[str] = []
+    start: float = time.perf_counter()
+    await asyncio.gather(*(client(socket, options.requests, latencies, failures)
+                           for _ in range(options.connections)))
+    elapsed: float = time.perf_counter() - start
+    if server is not None:
+        server.terminate()
+        await server.wait()
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies)} requests, {len(failures)} failed, {options.connections} connections")
+    print(f"p50 {quantiles[49] * 1000:8.2f} ms")
+    print(f"p99 {quantiles[98] * 1000:8.2f} ms")
+    print(f"{len(latencies) / elapsed:8.0f} requests/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load client for loxserver.py")
+    parser.add_argument("--socket", help="Unix socket of a running server")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="per connection")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="of the server started")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+""" Startup latency of short script runs, plain pylox.py against the daemon
+    Starts loxdaemon.py on a temporary socket and runs the same one line script
+    through pylox.py and through the thin client pyloxc.py
+
+    python benchmark/startup.py [runs] """
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def timings(command: List[str], runs: int, environment: dict) -> List[float]:
+    """ Return wall time in ms of each run of command """
+    times: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True, env=environment)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(name: str, times: List[float]) -> None:
+    """ Print median and spread of times """
+    print(f"{name:22} median {statistics.median(times):7.1f} ms   min {min(times):7.1f} ms   "
+          f"max {max(times):7.1f} ms")
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    runs: int = int(args[0]) if args else 20
+    directory: str = tempfile.mkdtemp()
+    script: str = os.path.join(directory, "hello.lox")
+    with open(script, "w") as source:
+        source.write('print "hello";\n')
+    environment = dict(os.environ, PYLOX_SOCKET=os.path.join(directory, "lox.sock"))
+    daemon = subprocess.Popen([sys.executable, os.path.join(ROOT, "loxdaemon.py")], env=environment,
+                              stderr=subprocess.PIPE)
+    daemon.stderr.readline()  # serving
+    try:
+        report("python -c pass", timings([sys.executable, "-c", "pass"], runs, environment))
+        report("pylox.py", timings([sys.executable, os.path.join(ROOT, "pylox.py"), script], runs, environment))
+        report("pyloxc.py + daemon", timings([sys.executable, os.path.join(ROOT, "pyloxc.py"), script], runs,
+                                             environment))
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
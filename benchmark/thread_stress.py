@@ -0,0 +1,106 @@
+""" Run 32 independent Lox programs at once on a thread pool
+    Every program is first run alone for its expected output, then all are
+    compiled and run concurrently, some sharing one compiled program, and the
+    outputs, results and compile errors must match exactly
+
+    python benchmark/thread_stress.py [rounds] """
+
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pylox  # noqa: E402
+from loxerror import LoxCompileError, LoxRuntimeError  # noqa: E402
+
+THREADS: int = 32
+
+PROGRAMS: List[str] = [
+    """fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+var result = fib(15) + seed;
+print result;""",
+    """class Point {
+  init(x, y) { this.x = x; this.y = y; }
+  add(other) { return Point(this.x + other.x, this.y + other.y); }
+}
+var p = Point(0, 0);
+for (var i = 0; i < 2000; i = i + 1) { p = p.add(Point(i, seed)); }
+var result = p.x + p.y;
+print result;""",
+    """class A { name() { return "A" + tag; } }
+class B < A { name() { return "B" + super.name(); } }
+var result = "";
+for (var i = 0; i < 300; i = i + 1) { result = result + B().name(); }
+print result;""",
+    """fun counter() { var n = 0; fun inc() { n = n + seed; return n; } return inc; }
+var c = counter();
+var result = 0;
+for (var i = 0; i < 3000; i = i + 1) { result = c(); }
+print result;""",
+    """var m = Map();
+for (var i = 0; i < 2000; i = i + 1) { m.set(i, i * seed); }
+var result = m.size();
+print m.get(13);""",
+    """var total = 0;
+for (var i = 0; i < 3000; i = i + 1) { total = total + i / (seed + 1); }
+var result = total;
+print total;""",
+    """var x = 1;
+print x + ;""",
+    """fun broken() { return nil + seed; }
+broken();""",
+]
+
+
+def run(program: pylox.loxprogram.Program, seed: int) -> Tuple[str, object]:
+    """ Run program, return its output and result or error """
+    stdout = io.StringIO()
+    try:
+        result = program.run(globals={"seed": seed, "tag": str(seed)}, stdout=stdout).get("result")
+    except LoxRuntimeError as error:
+        result = "error: " + str(error)
+    return stdout.getvalue(), result
+
+
+def job(index: int, shared: List[object]) -> Tuple[str, object]:
+    """ Compile and run program of index, or run the shared compiled program """
+    source: str = PROGRAMS[index % len(PROGRAMS)]
+    if index % 2 and not isinstance(shared[index % len(PROGRAMS)], LoxCompileError):
+        program = shared[index % len(PROGRAMS)]
+    else:
+        try:
+            program = pylox.compile(source)
+        except LoxCompileError as error:
+            return "", "compile: " + str(error)
+    return run(program, index)
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    rounds: int = int(args[0]) if args else 3
+    shared: List[object] = []
+    for source in PROGRAMS:
+        try:
+            shared.append(pylox.compile(source))
+        except LoxCompileError as error:
+            shared.append(error)
+    expected = [job(index, shared) for index in range(THREADS)]
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        for _ in range(rounds):
+            results = list(pool.map(job, range(THREADS), [shared] * THREADS))
+            for index, (got, want) in enumerate(zip(results, expected)):
+                if got != want:
+                    print(f"program {index} differs: {got!r} != {want!r}")
+                    sys.exit(1)
+    elapsed: float = time.perf_counter() - start
+    print(f"{rounds * THREADS} concurrent runs matched in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
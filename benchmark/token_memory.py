@@ -0,0 +1,41 @@
+""" Measure memory held by the tokens of a large generated program
+    Identifiers are interned, so every use of a name shares one string
+
+    python benchmark/token_memory.py [functions] """
+
+import os
+import sys
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import loxscanner  # noqa: E402
+import loxtoken  # noqa: E402
+
+
+def program(functions: int) -> str:
+    """ Return source of functions using a small set of variable names """
+    lines: List[str] = []
+    for i in range(functions):
+        lines.append(f"fun function{i}(count, total) {{ var index = 0; "
+                     f"while (index < count) {{ total = total + index; index = index + 1; }} return total; }}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """ Main function """
+    args: List[str] = sys.argv[1:]
+    functions: int = int(args[0]) if args else 10000
+    source: str = program(functions)
+    tracemalloc.start()
+    tokens: List[loxtoken.Token] = loxscanner.Scanner().scan_tokens(source)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    names = [token.lexeme for token in tokens if token.symbol_id is not None]
+    print(f"{len(tokens)} tokens, {size / len(tokens):.1f} bytes per token")
+    print(f"{len(names)} identifiers, {len(set(map(id, names)))} distinct strings")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,7 +32,7 @@ class GenerateAST:
                   "Print        : Expr expression",
                   "Return       : Token keyword, Expr value",
                   "Var          : Token name, Expr initializer",
-                  "While        : Expr condition, Block body"]
+                  "While        : Token keyword, Expr condition, Block body"]
 
     def __init__(self, output_dir):
         self.output_dir = output_dir
@@ -104,7 +104,8 @@ class Var(Stmt):
 
 class While(Stmt):
 
-    def __init__(self, condition: Expr, body: Block):
+    def __init__(self, keyword: Token, condition: Expr, body: Block):
+        self.keyword = keyword
         self.condition = condition
         self.body = body
 
@@ -0,0 +1,290 @@
+from typing import List, Dict, Set, Optional, TYPE_CHECKING
+
+import loxExprAST
+import loxStmtAST
+
+if TYPE_CHECKING:
+    import loxcallable
+    import loxclass
+    import loxinterpreter
+
+
+class Walker:
+    """ Base class for whole program analyses
+        Visits every statement and expression, subclasses override the visits they need """
+
+    def walk(self, stmts: List[loxStmtAST.Stmt]) -> None:
+        """ Walk list of statements """
+        for stmt in stmts:
+            if stmt is not None:
+                stmt.accept(self)
+
+    def walk_expr(self, expr: Optional[loxExprAST.Expr]) -> None:
+        """ Walk expression """
+        if expr is not None:
+            expr.accept(self)
+
+    # ---------------------------------------------------------------------------------
+
+    def visit_block_stmt(self, stmt: loxStmtAST.Block) -> None:
+        self.walk(stmt.statements)
+
+    def visit_class_stmt(self, stmt: loxStmtAST.Class) -> None:
+        self.walk_expr(stmt.superclass)
+        self.walk(stmt.methods)
+
+    def visit_expression_stmt(self, stmt: loxStmtAST.Expression) -> None:
+        self.walk_expr(stmt.expression)
+
+    def visit_function_stmt(self, stmt: loxStmtAST.Function) -> None:
+        self.walk(stmt.body)
+
+    def visit_if_stmt(self, stmt: loxStmtAST.If) -> None:
+        self.walk_expr(stmt.condition)
+        self.walk([stmt.then_branch, stmt.else_branch])
+
+    def visit_print_stmt(self, stmt: loxStmtAST.Print) -> None:
+        self.walk_expr(stmt.expression)
+
+    def visit_return_stmt(self, stmt: loxStmtAST.Return) -> None:
+        self.walk_expr(stmt.value)
+
+    def visit_var_stmt(self, stmt: loxStmtAST.Var) -> None:
+        self.walk_expr(stmt.initializer)
+
+    def visit_while_stmt(self, stmt: loxStmtAST.While) -> None:
+        self.walk_expr(stmt.condition)
+        self.walk([stmt.body])
+
+    def visit_assign_expr(self, expr: loxExprAST.Assign) -> None:
+        self.walk_expr(expr.value)
+
+    def visit_binary_expr(self, expr: loxExprAST.Binary) -> None:
+        self.walk_expr(expr.left)
+        self.walk_expr(expr.right)
+
+    def visit_call_expr(self, expr: loxExprAST.Call) -> None:
+        self.walk_expr(expr.callee)
+        for arg in expr.arguments:
+            self.walk_expr(arg)
+
+    def visit_get_expr(self, expr: loxExprAST.Get) -> None:
+        self.walk_expr(expr.get_object)
+
+    def visit_grouping_expr(self, expr: loxExprAST.Grouping) -> None:
+        self.walk_expr(expr.expression)
+
+    def visit_literal_expr(self, expr: loxExprAST.Literal) -> None:
+        pass
+
+    def visit_logical_expr(self, expr: loxExprAST.Logical) -> None:
+        self.walk_expr(expr.left)
+        self.walk_expr(expr.right)
+
+    def visit_set_expr(self, expr: loxExprAST.Set) -> None:
+        self.walk_expr(expr.set_object)
+        self.walk_expr(expr.value)
+
+    def visit_super_expr(self, expr: loxExprAST.Super) -> None:
+        pass
+
+    def visit_this_expr(self, expr: loxExprAST.This) -> None:
+        pass
+
+    def visit_unary_expr(self, expr: loxExprAST.Unary) -> None:
+        self.walk_expr(expr.right)
+
+    def visit_variable_expr(self, expr: loxExprAST.Variable) -> None:
+        pass
+
+
+class DirectMethod:
+    """ The only implementation of a method name in the program
+        owner and function are filled in by the interpreter when the class is created """
+
+    __slots__ = ("declaration", "owner", "function")
+
+    def __init__(self, declaration: loxStmtAST.Function) -> None:
+        self.declaration = declaration
+        self.owner: Optional['loxclass.LoxClass'] = None
+        self.function: Optional['loxcallable.LoxFunction'] = None
+
+
+class ClassHierarchyAnalysis(Walker):
+    """ Devirtualise monomorphic method calls
+        A method name with a single implementation across all classes, which is never
+        assigned as a field, always resolves to that implementation. Calls obj.name(args)
+        to it are handed to the interpreter as direct calls guarded by the receiver class.
+        Keeps its tables between runs so later REPL lines can undo earlier decisions """
+
+    def __init__(self, interpreter: 'loxinterpreter.Interpreter') -> None:
+
+        self.interpreter = interpreter
+        self.implementations: Dict[int, List[loxStmtAST.Function]] = dict()  # keyed on symbol id of name
+        self.field_names: Set[int] = set()
+        self.sites: Dict[int, List[loxExprAST.Call]] = dict()  # method call sites by name
+        self.devirtualized: int = 0
+
+    def analyse(self, stmts: List[loxStmtAST.Stmt]) -> None:
+        """ Add statements to the program and update devirtualised call sites """
+        self.walk(stmts)
+        self.interpreter.direct_calls.clear()
+        for name, calls in self.sites.items():
+            declarations = self.implementations.get(name, [])
+            if len(declarations) != 1 or name in self.field_names:
+                continue
+            direct = self.interpreter.direct_methods.get(declarations[0])
+            if direct is None:
+                direct = DirectMethod(declarations[0])
+            for call in calls:
+                if len(call.arguments) == len(direct.declaration.params):
+                    self.interpreter.direct_calls[call] = direct
+                    self.interpreter.direct_methods[direct.declaration] = direct
+        self.devirtualized = len(self.interpreter.direct_calls)
+
+    def report(self) -> str:
+        """ Return number of devirtualised call sites """
+        total: int = sum(len(calls) for calls in self.sites.values())
+        return f"{self.devirtualized} of {total} method call sites devirtualised"
+
+    # ---------------------------------------------------------------------------------
+
+    def visit_class_stmt(self, stmt: loxStmtAST.Class) -> None:
+        for method in stmt.methods:
+            self.implementations.setdefault(method.name.symbol_id, []).append(method)
+        super().visit_class_stmt(stmt)
+
+    def visit_set_expr(self, expr: loxExprAST.Set) -> None:
+        self.field_names.add(expr.name.symbol_id)
+        super().visit_set_expr(expr)
+
+    def visit_call_expr(self, expr: loxExprAST.Call) -> None:
+        if isinstance(expr.callee, loxExprAST.Get):
+            self.sites.setdefault(expr.callee.name.symbol_id, []).append(expr)
+        super().visit_call_expr(expr)
+
+
+class PurityAnalysis(Walker):
+    """ Find pure functions, whose result depends only on their arguments
+        A pure function has no print, no field access, no nested functions or classes,
+        assigns only its own locals and calls only other pure functions by name.
+        The interpreter memoises calls to them (see loxcallable.Memo) """
+
+    def __init__(self, interpreter: 'loxinterpreter.Interpreter') -> None:
+
+        self.interpreter = interpreter
+        self.functions: List[loxStmtAST.Function] = []
+        self.declarations: Dict[int, int] = dict()  # times each name (symbol id) is declared anywhere
+        self.assigned: Set[int] = set()  # names assigned anywhere
+
+    def analyse(self, stmts: List[loxStmtAST.Stmt]) -> None:
+        """ Add statements to the program and update the pure functions
+            Functions start out pure and are removed until none changes """
+        self.walk(stmts)
+        by_name: Dict[int, loxStmtAST.Function] = {
+            funct.name.symbol_id: funct for funct in self.functions
+            if self.declarations[funct.name.symbol_id] == 1 and funct.name.symbol_id not in self.assigned}
+        pure: Set[loxStmtAST.Function] = set(self.functions)
+        changed: bool = True
+        while changed:
+            changed = False
+            for funct in list(pure):
+                if not PurityCheck(self.interpreter, by_name, pure).check(funct):
+                    pure.remove(funct)
+                    changed = True
+        for funct, memo in self.interpreter.memos.items():
+            if funct not in pure:
+                memo.disable()
+        self.interpreter.pure_functions = pure
+
+    def report(self) -> str:
+        """ Return pure functions found """
+        names: List[str] = sorted(funct.name.lexeme for funct in self.interpreter.pure_functions)
+        return f"{len(names)} pure functions memoised: {' '.join(names)}"
+
+    # ---------------------------------------------------------------------------------
+
+    def declare(self, name: int) -> None:
+        """ Count declaration of name """
+        self.declarations[name] = self.declarations.get(name, 0) + 1
+
+    def visit_class_stmt(self, stmt: loxStmtAST.Class) -> None:
+        self.declare(stmt.name.symbol_id)
+        self.walk_expr(stmt.superclass)
+        for method in stmt.methods:  # methods are never memoised, only their bodies are scanned
+            self.declare(method.name.symbol_id)
+            self.walk(method.body)
+
+    def visit_function_stmt(self, stmt: loxStmtAST.Function) -> None:
+        self.functions.append(stmt)
+        self.declare(stmt.name.symbol_id)
+        for param in stmt.params:
+            self.declare(param.symbol_id)
+        super().visit_function_stmt(stmt)
+
+    def visit_var_stmt(self, stmt: loxStmtAST.Var) -> None:
+        self.declare(stmt.name.symbol_id)
+        super().visit_var_stmt(stmt)
+
+    def visit_assign_expr(self, expr: loxExprAST.Assign) -> None:
+        self.assigned.add(expr.name.symbol_id)
+        super().visit_assign_expr(expr)
+
+
+class PurityCheck(Walker):
+    """ Check body of one function against the current set of pure functions """
+
+    def __init__(self, interpreter: 'loxinterpreter.Interpreter', by_name: Dict[int, loxStmtAST.Function],
+                 pure: Set[loxStmtAST.Function]) -> None:
+
+        self.interpreter = interpreter
+        self.by_name = by_name
+        self.pure = pure
+        self.is_pure: bool = True
+
+    def check(self, funct: loxStmtAST.Function) -> bool:
+        """ Return True if funct is pure """
+        if funct.name.symbol_id not in self.by_name:
+            return False
+        self.walk(funct.body)
+        return self.is_pure
+
+    # Anything with side effects or depending on state makes the function impure
+
+    def visit_class_stmt(self, stmt: loxStmtAST.Class) -> None:
+        self.is_pure = False
+
+    def visit_function_stmt(self, stmt: loxStmtAST.Function) -> None:
+        self.is_pure = False
+
+    def visit_print_stmt(self, stmt: loxStmtAST.Print) -> None:
+        self.is_pure = False
+
+    def visit_get_expr(self, expr: loxExprAST.Get) -> None:
+        self.is_pure = False
+
+    def visit_set_expr(self, expr: loxExprAST.Set) -> None:
+        self.is_pure = False
+
+    def visit_super_expr(self, expr: loxExprAST.Super) -> None:
+        self.is_pure = False
+
+    def visit_this_expr(self, expr: loxExprAST.This) -> None:
+        self.is_pure = False
+
+    def visit_assign_expr(self, expr: loxExprAST.Assign) -> None:
+        if expr not in self.interpreter.locals:
+            self.is_pure = False
+        super().visit_assign_expr(expr)
+
+    def visit_variable_expr(self, expr: loxExprAST.Variable) -> None:
+        if expr not in self.interpreter.locals:
+            self.is_pure = False
+
+    def visit_call_expr(self, expr: loxExprAST.Call) -> None:
+        callee = expr.callee
+        if not isinstance(callee, loxExprAST.Variable) or callee in self.interpreter.locals \
+                or self.by_name.get(callee.name.symbol_id) not in self.pure:
+            self.is_pure = False
+        for arg in expr.arguments:
+            self.walk_expr(arg)
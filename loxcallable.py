@@ -1,6 +1,8 @@
-from typing import List, TYPE_CHECKING
+import math
+from collections import OrderedDict
+from typing import List, Tuple, Optional, TYPE_CHECKING
 
-from loxenvironment import Environment
+from loxenvironment import LocalEnvironment, Cell
 from loxerror import Return
 
 if TYPE_CHECKING:
@@ -25,35 +27,56 @@ class LoxCallable:
 class LoxFunction(LoxCallable):
     """ Class to handle functions in lox """
 
-    def __init__(self, declaration, closure: Environment, is_initializer: bool = False):
+    def __init__(self, declaration, upvalues: List[Cell], is_initializer: bool = False, instance: object = None):
         super(LoxFunction, self).__init__(declaration)
 
-        self.closure = closure
+        self.upvalues = upvalues  # only the captured variables, not the defining environment
         self.declaration = declaration
         self.is_initializer = is_initializer
+        self.instance = instance  # bound 'this' for methods used as values
+        self.memo: Optional[Memo] = None  # cache of results if memoised
 
     def bind(self, instance):
-        """ Create new environment enclosing closure and define 'this' """
-        environment: Environment = Environment(self.closure)
-        environment.define("this", instance)
-        return LoxFunction(self.declaration, environment, self.is_initializer)
+        """ Create bound method holding 'this'
+            Only needed when a method escapes as a value, calls go through invoke """
+        return LoxFunction(self.declaration, self.upvalues, self.is_initializer, instance)
 
     def call(self, interpreter: 'loxinterpreter.Interpreter', arguments: List[object]) -> object:
         """ Run the function """
-        environment: Environment = Environment(self.closure)
-        i = 0
-        for parameter in self.declaration.params:
-            environment.define(parameter.lexeme, arguments[i])
-            i += 1
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as return_value:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return return_value.value
-        if self.is_initializer:
-            return self.closure.get_at(0, "this")
-        return None
+        return self.invoke(interpreter, self.instance, arguments)
+
+    def invoke(self, interpreter: 'loxinterpreter.Interpreter', instance: object, arguments: List[object]) -> object:
+        """ Run the function with 'this' defined in the call environment
+            Methods are called directly on instance without binding them first """
+        if self.memo is not None:
+            return self.memo.call(self, interpreter, instance, arguments)
+        return self.execute(interpreter, instance, arguments)
+
+    def execute(self, interpreter: 'loxinterpreter.Interpreter', instance: object, arguments: List[object]) -> object:
+        """ Run the function body
+            Tail calls returned as TailCall run here in a loop (a trampoline) instead of nesting """
+        function: LoxFunction = self
+        while True:
+            if interpreter.metered:
+                interpreter.fuel -= 1
+                if interpreter.fuel < 0:
+                    interpreter.refuel(function.declaration.name)
+            environment: LocalEnvironment = interpreter.new_environment(None)
+            if instance is not None:
+                environment.values.append(instance)  # slot 0 is 'this' in methods
+            environment.values.extend(arguments)  # then parameters, in order
+            try:
+                interpreter.execute_block(function.declaration.body, environment, function.upvalues)
+            except Return as return_value:
+                if type(return_value.value) is TailCall:
+                    function, instance, arguments = return_value.value.unpack()
+                    continue
+                if function.is_initializer:
+                    return instance
+                return return_value.value
+            if function.is_initializer:
+                return instance
+            return None
 
     def arity(self) -> int:
         """ Returns no of parameters required """
@@ -62,3 +85,65 @@ class LoxFunction(LoxCallable):
     def __str__(self) -> str:
         """ Return function as string """
         return f'<fn {self.declaration.name.lexeme} >'
+
+
+class TailCall:
+    """ Call in tail position, returned for the calling function to run """
+
+    __slots__ = ("function", "instance", "arguments")
+
+    def __init__(self, function: LoxFunction, instance: object, arguments: List[object]) -> None:
+        self.function = function
+        self.instance = instance
+        self.arguments = arguments
+
+    def unpack(self) -> Tuple[LoxFunction, object, List[object]]:
+        """ Return function, instance and arguments """
+        return self.function, self.instance, self.arguments
+
+
+class Memo:
+    """ Bounded LRU cache of the results of a function, keyed on its arguments
+        Only calls with number, string, bool and nil arguments are cached """
+
+    DEFAULT_SIZE: int = 1000  # entries kept for functions memoised automatically
+    key_types = (int, float, str, bool, type(None))
+
+    def __init__(self, max_size: int = DEFAULT_SIZE) -> None:
+        self.max_size = max_size
+        self.results: OrderedDict = OrderedDict()
+        self.enabled: bool = True
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def call(self, function: LoxFunction, interpreter: 'loxinterpreter.Interpreter', instance: object,
+             arguments: List[object]) -> object:
+        """ Return cached result or run function and cache it """
+        types = tuple(type(argument) for argument in arguments)
+        if not self.enabled or not all(arg_type in Memo.key_types for arg_type in types):
+            return function.execute(interpreter, instance, arguments)
+        key = (instance, tuple(arguments), types)  # types keep true and 1 apart
+        if 0 in arguments:  # 0.0 and -0.0 are equal as keys, signs keep them apart
+            key += (tuple(math.copysign(1.0, argument) if type(argument) is float else 1.0
+                          for argument in arguments),)
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+        self.misses += 1
+        result = function.execute(interpreter, instance, arguments)
+        self.results[key] = result
+        if len(self.results) > self.max_size:
+            self.results.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def disable(self) -> None:
+        """ Stop caching, function is no longer known to be pure """
+        self.enabled = False
+        self.results.clear()
+
+    def __str__(self) -> str:
+        """ Return counters as string """
+        return f"hits {self.hits} misses {self.misses} evictions {self.evictions}"
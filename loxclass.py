@@ -1,6 +1,7 @@
-from typing import List, Dict, Optional, TYPE_CHECKING
+from typing import List, Dict, Optional, FrozenSet, TYPE_CHECKING
 
 import loxcallable
+import loxsymbol
 import loxtoken
 from loxerror import LoxRuntimeError
 from loxerror import raise_error
@@ -10,6 +11,28 @@ if TYPE_CHECKING:
     import loxtoken
 
 
+class Shape:
+    """ Hidden class describing the field layout of instances
+        Maps field names (symbol ids) to slot indices. Adding a field moves an instance
+        to the next shape, shared by all instances that add the same fields in the same order """
+
+    def __init__(self, index: Optional[Dict[int, int]] = None) -> None:
+        if index is None:
+            index = dict()
+        self.index: Dict[int, int] = index
+        self.transitions: Dict[int, 'Shape'] = dict()
+
+    def add(self, name: int) -> 'Shape':
+        """ Return shape with field name added """
+        shape = self.transitions.get(name)
+        if shape is None:
+            index = dict(self.index)
+            index[name] = len(index)
+            shape = Shape(index)
+            self.transitions[name] = shape
+        return shape
+
+
 class LoxClass(loxcallable.LoxCallable):
 
     def __init__(self, name: str, superclass: 'LoxClass', methods=None):
@@ -19,6 +42,8 @@ class LoxClass(loxcallable.LoxCallable):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        self.shape: Shape = Shape()  # root shape, so a shape also identifies the class
+        self.ancestors: FrozenSet[LoxClass] = frozenset([self]) | (superclass.ancestors if superclass else frozenset())
 
     def __str__(self) -> str:
         """ Return class as string """
@@ -27,20 +52,20 @@ class LoxClass(loxcallable.LoxCallable):
     def call(self, interpreter: 'loxinterpreter.Interpreter', arguments: List[object]) -> 'LoxInstance':
         """ Call the class """
         instance: 'LoxInstance' = LoxInstance(self)
-        initializer = self.find_method("init")
+        initializer = self.find_method(loxsymbol.INIT)
         if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+            initializer.invoke(interpreter, instance, arguments)
         return instance
 
     def arity(self) -> int:
         """ Returns no of parameters required """
-        initializer = self.find_method("init")
+        initializer = self.find_method(loxsymbol.INIT)
         if initializer is not None:
             return initializer.arity()
         return 0
 
-    def find_method(self, name: str) -> Optional[loxcallable.LoxFunction]:
-        """ Find and return class method """
+    def find_method(self, name: int) -> Optional[loxcallable.LoxFunction]:
+        """ Find and return class method by symbol id """
         if name in self.methods:
             return self.methods[name]
         if self.superclass is not None:
@@ -50,9 +75,12 @@ class LoxClass(loxcallable.LoxCallable):
 
 class LoxInstance:
 
+    __slots__ = ("klass", "shape", "slots")
+
     def __init__(self, klass: LoxClass):
         self.klass = klass
-        self.fields: Dict[str, object] = dict()
+        self.shape: Shape = klass.shape
+        self.slots: List[object] = []  # field values, indexed through shape
 
     def __str__(self) -> str:
         """ Return class instance as string """
@@ -60,13 +88,19 @@ class LoxInstance:
 
     def get(self, name: loxtoken.Token):
         """ Get property """
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
-        method = self.klass.find_method(name.lexeme)
+        index = self.shape.index.get(name.symbol_id)
+        if index is not None:
+            return self.slots[index]
+        method = self.klass.find_method(name.symbol_id)
         if method is not None:
             return method.bind(self)
         raise_error(LoxRuntimeError, name, "Undefined property '" + name.lexeme + "'.")
 
     def set(self, name: loxtoken.Token, value: object):
         """ Set value of property """
-        self.fields[name.lexeme] = value
+        index = self.shape.index.get(name.symbol_id)
+        if index is not None:
+            self.slots[index] = value
+        else:
+            self.shape = self.shape.add(name.symbol_id)
+            self.slots.append(value)
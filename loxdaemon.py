@@ -0,0 +1,119 @@
+""" Pre-forking Lox daemon
+    Loads every module once, freezes the loaded objects out of the garbage collector
+    and forks a child per script run, so a run starts with Python and the interpreter
+    already warm. The client, pyloxc.py, passes its arguments, working directory and
+    stdin, stdout and stderr; the child runs pylox.py's main on them.
+
+    The socket is made in a directory private to the user (see pyloxc.socket_path) and
+    both ends check the other runs as the same user, so no one else can connect to the
+    daemon or pass themselves off as it.
+
+    python loxdaemon.py [--socket path] """
+
+import argparse
+import gc
+import importlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from typing import Tuple
+
+import loxprogram
+import pylox
+import pyloxc
+
+PRELOAD: Tuple[str, ...] = ("loxdriver", "loxscheduler", "loximage")  # modules children may use
+
+
+def preload() -> None:
+    """ Import the modules children may use, so no child has to load them """
+    for name in PRELOAD:
+        importlib.import_module(name)
+
+
+def warm_up() -> None:
+    """ Run a small program so lazily built state exists before forking """
+    program = loxprogram.compile('class A { init(x) { this.x = x; } } var a = A(1); print "" + "x";')
+    program.run(stdout=io.StringIO())
+
+
+def run_child(connection: socket.socket) -> None:
+    """ Child process: run the client's script on its stdio, report exit status """
+    message, fds, _, _ = socket.recv_fds(connection, 1024 * 1024, 3)
+    request = json.loads(message)
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    status: int = 0
+    try:
+        os.chdir(request["cwd"])
+        sys.argv = ["pylox.py"] + request["args"]
+        pylox.main()
+    except SystemExit as exit_request:
+        status = exit_request.code if isinstance(exit_request.code, int) else 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    connection.sendall(json.dumps({"status": status}).encode() + b"\n")
+
+
+def serve(path: str) -> None:
+    """ Accept clients until interrupted, forking a child for each """
+    if os.path.exists(path):
+        os.unlink(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask: int = os.umask(0o177)  # socket is created private, no window before a chmod
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(umask)
+    listener.listen(128)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # children are reaped automatically
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # to remove the socket
+    preload()
+    warm_up()
+    gc.collect()
+    gc.freeze()  # collector leaves the loaded objects alone, so forked pages stay shared
+    print(f"Serving on {path}", file=sys.stderr)
+    sys.stderr.flush()
+    try:
+        while True:
+            connection, _ = listener.accept()
+            if pyloxc.peer_uid(connection) != os.getuid():  # clients must be this user
+                connection.close()
+                continue
+            if os.fork() == 0:
+                listener.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                try:
+                    run_child(connection)
+                finally:
+                    os._exit(0)
+            connection.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        os.unlink(path)
+
+
+def main() -> None:
+    """ Main function """
+    parser = argparse.ArgumentParser(description="Pre-forking Lox daemon")
+    parser.add_argument("--socket", default=pyloxc.socket_path())
+    options = parser.parse_args()
+    if options.socket is None:
+        parser.error("no private directory for the socket, give one with --socket")
+    serve(options.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import csv
+import json
+from typing import List, Optional, TextIO
+
+import loxcallable
+import loxinterpreter
+import loxlist
+import loxmap
+import loxoutput
+from loxnative import stringify
+from loxprogram import to_lox, to_python
+from loxsymbol import symbols
+
+
+class RecordDriver:
+    """ Run a Lox function over every record of a JSONL or CSV stream
+        The script has been compiled and run once, the function is called with each record
+        converted to Lox values (objects become maps, arrays lists). Results are written
+        one per line, nil results are dropped. A record that fails is reported on
+        stderr and the stream goes on """
+
+    def __init__(self, interpreter: loxinterpreter.Interpreter, function_name: str, is_csv: bool = False) -> None:
+        self.interpreter = interpreter
+        self.function_name = function_name
+        self.is_csv = is_csv
+        self.header: Optional[List[str]] = None  # csv output columns, from the first map result
+        self.records: int = 0
+        self.errors: int = 0
+
+    def run(self, source: TextIO, output: loxoutput.Output, errors: TextIO) -> None:
+        """ Call function over each record of source, the script has already run """
+        function = self.interpreter.globals.values.get(symbols.intern(self.function_name))
+        if not isinstance(function, loxcallable.LoxCallable) or function.arity() != 1:
+            errors.write(f"Script has no function {self.function_name} of 1 argument.\n")
+            return
+        writer = csv.writer(output, lineterminator="\n") if self.is_csv else None
+        try:
+            for record in self.read(source, errors):
+                self.records += 1
+                try:
+                    result = function.call(self.interpreter, [record])
+                    if result is None:
+                        continue
+                    if writer is None:
+                        output.write(json.dumps(to_python(result), separators=(",", ":"), default=stringify,
+                                                allow_nan=False) + "\n")
+                    else:
+                        self.write_row(writer, result)
+                except Exception as error:  # Lox errors, inf or nan in JSON, anything a native raises
+                    self.errors += 1
+                    errors.write(f"record {self.records}: {error}\n")
+        finally:
+            self.interpreter.output.flush()
+            output.flush()
+
+    def read(self, source: TextIO, errors: TextIO):
+        """ Yield records of source as Lox values, skipping lines that cannot be read """
+        if self.is_csv:
+            rows = csv.reader(source)
+            try:
+                columns: Optional[List[str]] = next(rows, None)
+            except csv.Error as error:
+                errors.write(f"header: {error}\n")
+                return
+            while True:
+                try:
+                    row: List[str] = next(rows)
+                except StopIteration:
+                    return
+                except csv.Error as error:  # the reader goes on with the next row
+                    self.reject(error, errors)
+                    continue
+                yield loxmap.LoxMap(dict(zip(columns, row)))
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                yield to_lox(json.loads(line))
+            except ValueError as error:
+                self.reject(error, errors)
+
+    def reject(self, error: Exception, errors: TextIO) -> None:
+        """ Count record that cannot be read as failed and report it """
+        self.records += 1
+        self.errors += 1
+        errors.write(f"record {self.records}: {error}\n")
+
+    def write_row(self, writer, result: object) -> None:
+        """ Write result as csv row, maps give the columns named in the header """
+        if isinstance(result, loxmap.LoxMap):
+            if self.header is None:
+                self.header = [stringify(loxmap.from_key(key)) for key in result.entries]
+                writer.writerow(self.header)
+            values = {stringify(loxmap.from_key(key)): value for key, value in result.entries.items()}
+            writer.writerow([csv_value(values.get(column)) for column in self.header])
+        elif isinstance(result, loxlist.LoxList):
+            writer.writerow([csv_value(item) for item in result.items])
+        else:
+            writer.writerow([csv_value(result)])
+
+
+def csv_value(value: object) -> str:
+    """ Return Lox value as csv field """
+    value = to_python(value)
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"), default=stringify, allow_nan=False)
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return stringify(value)
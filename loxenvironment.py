@@ -1,28 +1,44 @@
-from typing import Dict, Any
+from typing import Dict, List, Tuple, Union, Any
 
 from loxerror import LoxRuntimeError, raise_error
 from loxtoken import Token
 
 
+class Cell:
+    """ Box for a variable captured by a closure
+        Replaces the value in its environment so both share the variable """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: object = None) -> None:
+        self.value = value
+
+
 class Environment:
-    """ Class defining environments """
+    """ Class defining environments
+        Used for globals, where names are looked up dynamically """
+
+    __slots__ = ("enclosing", "values", "display")
 
     def __init__(self, enclosing: 'Environment' = None) -> None:
 
         self.enclosing = enclosing
-        self.values: Dict[str, object] = dict()
+        self.values: Dict[int, object] = dict()  # keyed on symbol id of name
+        self.display: Tuple['Environment', ...] = ()
 
-    def define(self, name: str, value: object = None) -> None:
-        """ Add name and value to environment """
+    def define(self, name: int, value: object = None) -> int:
+        """ Add name (symbol id) and value to environment
+            Return key to assign to it later """
         self.values[name] = value
+        return name
 
-    def get_at(self, distance: int, name: str) -> Any:
-        """ get value of token from environment at depth distance """
+    def get_at(self, distance: int, name: int) -> Any:
+        """ get value of name from environment at depth distance """
         return self.ancestor(distance).values.get(name)
 
-    def assign_at(self, distance: int, name: Token, value: object) -> None:
-        """ assign value of token from environment at depth distance """
-        self.ancestor(distance).values[name.lexeme] = value
+    def assign_at(self, distance: int, name: int, value: object) -> None:
+        """ assign value of name from environment at depth distance """
+        self.ancestor(distance).values[name] = value
 
     def ancestor(self, distance: int) -> 'Environment':
         """ Return environment at distance steps from current """
@@ -33,8 +49,8 @@ class Environment:
 
     def get(self, name: Token) -> object:
         """ get value of token from nearest environment """
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
+        if name.symbol_id in self.values:
+            return self.values[name.symbol_id]
         if self.enclosing is not None:
             return self.enclosing.get(name)
         raise_error(LoxRuntimeError, name, f'Undefined variable {name.lexeme}.')
@@ -43,10 +59,66 @@ class Environment:
     def assign(self, name: Token, value: object) -> None:
         """ set value of name in nearest environment where it exits 
             otherwise return error """
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
+        if name.symbol_id in self.values:
+            self.values[name.symbol_id] = value
             return
         if self.enclosing is not None:
             self.enclosing.assign(name, value)
             return
         raise_error(LoxRuntimeError, name, f'Undefined variable {name.lexeme}.')
+
+
+class LocalEnvironment:
+    """ Environment of a block or function call
+        The resolver gives each variable a slot in declaration order, so values is a list
+        filled by define as the declarations run. Captured variables hold a Cell """
+
+    __slots__ = ("enclosing", "values", "display")
+
+    def __init__(self, enclosing: Union[Environment, 'LocalEnvironment', None] = None) -> None:
+
+        self.enclosing = enclosing
+        self.values: List[object] = []
+        # Display of lexical ancestors, display[d - 1] is the environment d steps out
+        self.display: Tuple[Any, ...] = () if enclosing is None else (enclosing,) + enclosing.display
+
+    def define(self, name: str, value: object = None) -> int:
+        """ Add value to environment in the next slot
+            Return slot to assign to it later """
+        self.values.append(value)
+        return len(self.values) - 1
+
+    def get_at(self, distance: int, slot: int) -> Any:
+        """ get value of slot from environment at depth distance """
+        value = (self.display[distance - 1] if distance else self).values[slot]
+        if type(value) is Cell:
+            return value.value
+        return value
+
+    def assign_at(self, distance: int, slot: int, value: object) -> None:
+        """ assign value of slot from environment at depth distance """
+        values: List[object] = (self.display[distance - 1] if distance else self).values
+        cell = values[slot]
+        if type(cell) is Cell:
+            cell.value = value
+        else:
+            values[slot] = value
+
+    def capture(self, slot: int) -> Cell:
+        """ Return cell holding variable in slot, boxing its value on first capture """
+        cell = self.values[slot]
+        if type(cell) is not Cell:
+            cell = Cell(cell)
+            self.values[slot] = cell
+        return cell
+
+    def ancestor(self, distance: int) -> Any:
+        """ Return environment at distance steps from current """
+        if distance == 0:
+            return self
+        return self.display[distance - 1]
+
+    def reset(self, enclosing: Union[Environment, 'LocalEnvironment', None]) -> None:
+        """ Prepare environment taken from the free list for reuse """
+        self.enclosing = enclosing
+        self.display = () if enclosing is None else (enclosing,) + enclosing.display
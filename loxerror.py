@@ -1,10 +1,7 @@
-from typing import Union, Type
+from typing import Union, Type, List
 
 import loxtoken
 
-had_error: bool = False  # flag error to stop processing
-had_runtime_error: bool = False  # flag error to stop processing
-
 
 def raise_error(cls: Union[Type['LoxError'], Type['LoxParseError'],
                            Type['LoxRuntimeError']], token: Union[loxtoken.Token, int], msg: str) \
@@ -23,8 +20,6 @@ class LoxError(Exception):
     def __init__(self, line: int, message: str, where: str = "") -> None:
         super().__init__(message)
 
-        global had_error
-        had_error = True
         self.line = line
         self.message = message
         self.where = where
@@ -39,8 +34,6 @@ class LoxParseError(Exception):
     def __init__(self, token: loxtoken.Token, message: str) -> None:
         super().__init__(message)
 
-        global had_error
-        had_error = True
         self.token = token
         self.message = message
 
@@ -57,8 +50,6 @@ class LoxRuntimeError(RuntimeError):
     def __init__(self, token: loxtoken.Token, message: str) -> None:
         super().__init__(message)
 
-        global had_runtime_error
-        had_runtime_error = True
         self.token = token
         self.message = message
 
@@ -66,6 +57,61 @@ class LoxRuntimeError(RuntimeError):
         return f'[line {self.token.line}] {self.token.lexeme} Runtime Error: {self.message}'
 
 
+class LoxNativeError(Exception):
+    """ Class to handle errors in native functions
+        Reported as LoxRuntimeError at the call """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+        self.message = message
+
+
+class LoxCompileError(Exception):
+    """ Class to handle source that failed to compile
+        Raised by loxprogram.compile with the errors reported """
+
+    def __init__(self, errors: List[str]) -> None:
+        super().__init__("\n".join(errors))
+
+        self.errors = errors
+
+
+class LoxImageError(Exception):
+    """ Class to handle images that cannot be saved or loaded
+        Raised by loximage, for prelude values with no saved form or unreadable files """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+        self.message = message
+
+
+class ErrorReporter:
+    """ Errors reported while compiling
+        Each Lox session or compilation has its own, passed to its scanner, parser and
+        resolver, so compilations running side by side never see each other's errors """
+
+    def __init__(self, echo: bool = True) -> None:
+        self.errors: List[str] = []
+        self.echo = echo  # print errors as they are reported
+
+    @property
+    def had_error(self) -> bool:
+        """ Check for errors since last reset """
+        return bool(self.errors)
+
+    def report(self, error: Exception) -> None:
+        """ Record error """
+        self.errors.append(str(error))
+        if self.echo:
+            print(error)
+
+    def reset(self) -> None:
+        """ Forget errors, before compiling more source """
+        self.errors = []
+
+
 class Return(RuntimeError):
     """ Class to handle interpreter errors """
 
@@ -1,17 +1,307 @@
+import math
+import sys
 import time
+from typing import Dict, Tuple, TYPE_CHECKING
 
+import loxvector
 from loxenvironment import Environment
-from loxcallable import LoxCallable
+from loxcallable import LoxFunction, Memo
+from loxerror import LoxNativeError
+from loxlist import LoxList
+from loxmap import LoxMap
+from loxnative import NativeFunction, NativeModule, module, modules, check_number, check_string, check_index, stringify
+from loxreader import LoxReader, open_file, open_stdin
+from loxsymbol import symbols
+
+if TYPE_CHECKING:
+    import loxinterpreter
 
 
 class Globals:
-    """ Class defining environment with global functions """
+    """ Class defining environment with global functions
+        The core module is always loaded, other modules with load("name").
+        Sandboxed globals hold only the sandbox modules, see end of file """
 
-    def __init__(self):
+    def __init__(self, sandbox: bool = False):
         self.globals: Environment = Environment()
 
-        self.globals.define("clock", type("Clock",
-                                          (LoxCallable,),
-                                          {"arity": lambda: 0,
-                                           "call": lambda interpreter, arguments: float(time.time_ns() // 1000000),
-                                           "__str__": lambda: "<native fn>"}))
+        for symbol_id, value in (sandbox_modules["core"] if sandbox else core).members.items():
+            self.globals.define(symbol_id, value)
+
+
+# ---------------------------------------------------------------------------------
+# core: defined as globals
+
+core: NativeModule = module("core")
+
+
+@core.native("clock", 0)
+def clock() -> float:
+    """ Return time in ms """
+    return float(time.time_ns() // 1000000)
+
+
+@core.native("load", 1)
+def load(name: object) -> NativeModule:
+    """ Return module name """
+    if name not in modules:
+        raise LoxNativeError(f"Unknown module '{name}'.")
+    return modules[name]
+
+
+@core.native("List", 0)
+def new_list() -> LoxList:
+    """ Return new empty list """
+    return LoxList()
+
+
+@core.native("Map", 0)
+def new_map() -> LoxMap:
+    """ Return new empty map """
+    return LoxMap()
+
+
+@core.native("range", 2)
+def new_range(start: object, end: object) -> LoxList:
+    """ Return new list of whole numbers from start up to end """
+    return LoxList([float(number) for number in range(check_index(start, "Start"), check_index(end, "End"))])
+
+
+@core.native("openFile", 1)
+def new_file_reader(path: object) -> LoxReader:
+    """ Return reader of file, read with readLine or read(size) """
+    return open_file(check_string(path, "Path"))
+
+
+@core.native("stdin", 0)
+def new_stdin_reader() -> LoxReader:
+    """ Return reader of standard input """
+    return open_stdin()
+
+
+@core.native("memoize", 2)
+def memoize(function: object, max_size: object) -> LoxFunction:
+    """ Cache results of function, keeping at most max_size of them
+        Caller promises function is pure """
+    if not isinstance(function, LoxFunction):
+        raise LoxNativeError("Can only memoize functions.")
+    size: int = check_index(max_size, "Cache size")
+    if size < 1:
+        raise LoxNativeError("Cache size must be positive.")
+    function.memo = Memo(size)
+    return function
+
+
+@core.native("memoStats", 1)
+def memo_stats(function: object) -> str:
+    """ Return cache counters of function """
+    if not isinstance(function, LoxFunction):
+        raise LoxNativeError("Can only get cache statistics of functions.")
+    if function.memo is None:
+        return "not memoized"
+    return str(function.memo)
+
+
+# ---------------------------------------------------------------------------------
+# time
+
+time_module: NativeModule = module("time")
+time_module.constant("clock", core.get(symbols.intern("clock")))
+
+
+@time_module.native("now", 0)
+def now() -> float:
+    """ Return seconds since the epoch """
+    return time.time()
+
+
+@time_module.native("sleep", 1)
+def sleep(ms: object) -> None:
+    """ Wait ms milliseconds """
+    time.sleep(max(check_number(ms, "Time"), 0.0) / 1000)
+
+
+# ---------------------------------------------------------------------------------
+# math
+
+math_module: NativeModule = module("math")
+math_module.constant("pi", math.pi)
+math_module.constant("e", math.e)
+
+
+def math_function(name: str, function, params: int = 1) -> None:
+    """ Add Python math function of numbers to math module """
+    def native(*arguments: object) -> float:
+        for argument in arguments:
+            check_number(argument, "Argument")
+        try:
+            return float(function(*arguments))
+        except (ValueError, OverflowError) as error:
+            raise LoxNativeError(f"{name}: {error}.")
+    math_module.native(name, params)(native)
+
+
+math_function("abs", abs)
+math_function("sqrt", math.sqrt)
+math_function("floor", math.floor)
+math_function("ceil", math.ceil)
+math_function("round", round)
+math_function("exp", math.exp)
+math_function("log", math.log)
+math_function("sin", math.sin)
+math_function("cos", math.cos)
+math_function("tan", math.tan)
+math_function("atan2", math.atan2, 2)
+math_function("pow", math.pow, 2)
+math_function("min", min, 2)
+math_function("max", max, 2)
+math_function("mod", math.fmod, 2)
+
+
+# ---------------------------------------------------------------------------------
+# string
+
+string_module: NativeModule = module("string")
+
+
+@string_module.native("length", 1)
+def length(text: object) -> float:
+    """ Return number of characters in text """
+    return float(len(check_string(text, "Argument")))
+
+
+@string_module.native("substring", 3)
+def substring(text: object, start: object, end: object) -> str:
+    """ Return characters of text from start up to end """
+    return check_string(text, "Argument")[check_index(start, "Start"):check_index(end, "End")]
+
+
+@string_module.native("indexOf", 2)
+def index_of(text: object, part: object) -> float:
+    """ Return position of part in text or -1 """
+    return float(check_string(text, "Argument").find(check_string(part, "Search string")))
+
+
+@string_module.native("replace", 3)
+def replace(text: object, old: object, new: object) -> str:
+    """ Return text with all old replaced by new """
+    return check_string(text, "Argument").replace(check_string(old, "Search string"),
+                                                  check_string(new, "Replacement"))
+
+
+@string_module.native("upper", 1)
+def upper(text: object) -> str:
+    """ Return text in upper case """
+    return check_string(text, "Argument").upper()
+
+
+@string_module.native("lower", 1)
+def lower(text: object) -> str:
+    """ Return text in lower case """
+    return check_string(text, "Argument").lower()
+
+
+@string_module.native("trim", 1)
+def trim(text: object) -> str:
+    """ Return text without leading and trailing whitespace """
+    return check_string(text, "Argument").strip()
+
+
+@string_module.native("repeat", 2)
+def repeat(text: object, times: object) -> str:
+    """ Return text repeated times """
+    return check_string(text, "Argument") * max(check_index(times, "Count"), 0)
+
+
+@string_module.native("toString", 1)
+def to_string(value: object) -> str:
+    """ Return value as printed """
+    return stringify(value)
+
+
+@string_module.native("toNumber", 1)
+def to_number(text: object) -> object:
+    """ Return number in text or nil """
+    try:
+        return float(check_string(text, "Argument"))
+    except ValueError:
+        return None
+
+
+# ---------------------------------------------------------------------------------
+# vector: defined in loxvector, registered when it is imported
+
+vector_module: NativeModule = loxvector.vector_module
+
+
+# ---------------------------------------------------------------------------------
+# io
+
+io_module: NativeModule = module("io")
+
+
+@io_module.native("write", 1, with_interpreter=True)
+def write(interpreter: 'loxinterpreter.Interpreter', value: object) -> None:
+    """ Print value without new line """
+    interpreter.output.write(stringify(value))
+
+
+@io_module.native("readLine", 0, with_interpreter=True)
+def read_line(interpreter: 'loxinterpreter.Interpreter') -> object:
+    """ Return next line of input without new line, nil at end """
+    interpreter.output.flush()  # show any prompt first
+    line: str = sys.stdin.readline()
+    if not line:
+        return None
+    return line.rstrip("\n")
+
+
+@io_module.native("readFile", 1)
+def read_file(path: object) -> str:
+    """ Return contents of file """
+    try:
+        with open(check_string(path, "Path"), 'r') as source_file:
+            return source_file.read()
+    except OSError as error:
+        raise LoxNativeError(f"Cannot read file: {error.strerror}.")
+
+
+@io_module.native("writeFile", 2)
+def write_file(path: object, text: object) -> None:
+    """ Write text to file """
+    try:
+        with open(check_string(path, "Path"), 'w') as out_file:
+            out_file.write(check_string(text, "Text"))
+    except OSError as error:
+        raise LoxNativeError(f"Cannot write file: {error.strerror}.")
+
+
+# ---------------------------------------------------------------------------------
+# sandbox: modules for untrusted programs, without access to files or standard input
+
+unsafe_modules: Tuple[str, ...] = ("io",)  # cannot be loaded in the sandbox
+unsafe_members: Dict[str, Tuple[str, ...]] = {"core": ("openFile", "stdin"), "vector": ("fromFile",)}
+
+
+def restricted(source: NativeModule) -> NativeModule:
+    """ Return copy of module without its unsafe members """
+    copy: NativeModule = NativeModule(source.name)
+    left_out = {symbols.intern(name) for name in unsafe_members.get(source.name, ())}
+    copy.members = {symbol_id: member for symbol_id, member in source.members.items() if symbol_id not in left_out}
+    return copy
+
+
+sandbox_modules: Dict[str, NativeModule] = {name: restricted(source) for name, source in modules.items()
+                                            if name not in unsafe_modules}
+
+
+def load_sandboxed(name: object) -> NativeModule:
+    """ Return sandbox module name """
+    if name not in sandbox_modules:
+        if name in modules:
+            raise LoxNativeError(f"Module '{name}' is not available in the sandbox.")
+        raise LoxNativeError(f"Unknown module '{name}'.")
+    return sandbox_modules[name]
+
+
+sandbox_modules["core"].members[symbols.intern("load")] = NativeFunction("load", load_sandboxed, 1)
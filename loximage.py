@@ -0,0 +1,167 @@
+import copy
+import io
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+import loxanalysis
+import loxExprAST
+import loxglobals
+import loxinterpreter
+import loxprogram
+import loxStmtAST
+from loxerror import LoxImageError
+from loxnative import NativeFunction, NativeModule, modules
+from loxsymbol import symbols
+
+
+class Image:
+    """ Globals left by a prelude, run once and saved to a file
+        The heap (classes, functions, instances and other values of the globals) is kept
+        pickled and loaded afresh into every interpreter given the image, so runs never
+        share it. The prelude's syntax tree, side tables and analyses are loaded once.
+        Symbol ids are saved as they are, so an image is only used where the names interned
+        so far agree with it, otherwise its prelude is run again.
+        Images are pickles, load only trusted files """
+
+    VERSION: int = 1
+
+    def __init__(self, source: str, program: loxprogram.Program,
+                 analyses: Tuple[loxanalysis.ClassHierarchyAnalysis, loxanalysis.PurityAnalysis],
+                 heap: bytes, shared: List[object]) -> None:
+        self.version: int = Image.VERSION
+        self.names: List[str] = list(symbols.names)  # symbol table the ids in the image belong to
+        self.source = source
+        self.tail_calls_enabled: bool = program.tail_calls_enabled
+        self.tables: Dict[str, object] = program.tables  # direct methods in it are left unbound
+        self.analyses = tuple(detach(analysis, None) for analysis in analyses)
+        self.heap = heap  # pickled globals, memos, bound direct methods and super targets
+        self.shared = shared  # tree nodes the heap refers to
+
+    def extend(self, interpreter: loxinterpreter.Interpreter) \
+            -> Tuple[loxanalysis.ClassHierarchyAnalysis, loxanalysis.PurityAnalysis]:
+        """ Add the prelude's side tables to interpreter, before compiling source using the image
+            Returns copies of the prelude's analyses to continue with that source """
+        for name, table in self.tables.items():
+            getattr(interpreter, name).update(table)
+        return detach(self.analyses[0], interpreter), detach(self.analyses[1], interpreter)
+
+    def install(self, interpreter: loxinterpreter.Interpreter) -> None:
+        """ Define a new copy of the prelude's globals in interpreter
+            Its tables must already include the prelude's, see extend """
+        values, memos, bound, super_methods = HeapUnpickler(io.BytesIO(self.heap), self.shared).load()
+        interpreter.globals.values.update(values)
+        interpreter.super_methods.update(super_methods)
+        for declaration, (owner, function) in bound.items():
+            direct: Optional[loxanalysis.DirectMethod] = interpreter.direct_methods.get(declaration)
+            if direct is not None:
+                direct.owner = owner
+                direct.function = function
+        # Later source may have made a prelude function impure, its cached results then go
+        for declaration, memo in memos.items():
+            if interpreter.memoize and declaration in interpreter.pure_functions:
+                interpreter.memos[declaration] = memo
+            else:
+                memo.disable()
+
+    def save(self, path: str) -> None:
+        """ Write image to file """
+        with open(path, "wb") as image_file:
+            pickle.dump(self, image_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class HeapPickler(pickle.Pickler):
+    """ Pickles values of a run, with tree nodes and native modules and functions by reference """
+
+    def __init__(self, file: io.BytesIO, shared: List[object]) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared = shared
+        self.shared_index: Dict[int, int] = dict()  # position in shared by object id
+        self.natives: Dict[int, Tuple[str, str]] = {id(member): (module.name, symbols.name(symbol_id))
+                                                    for module in modules.values()
+                                                    for symbol_id, member in module.members.items()
+                                                    if type(member) is NativeFunction}
+
+    def persistent_id(self, obj: object) -> Optional[Tuple[str, ...]]:
+        if isinstance(obj, (loxStmtAST.Stmt, loxExprAST.Expr)):
+            index: Optional[int] = self.shared_index.get(id(obj))
+            if index is None:
+                index = len(self.shared)
+                self.shared.append(obj)
+                self.shared_index[id(obj)] = index
+            return "tree", index
+        if type(obj) is NativeModule:
+            return "module", obj.name
+        if type(obj) is NativeFunction and id(obj) in self.natives:
+            return ("native",) + self.natives[id(obj)]
+        return None
+
+
+class HeapUnpickler(pickle.Unpickler):
+    """ Loads values pickled by HeapPickler """
+
+    def __init__(self, file: io.BytesIO, shared: List[object]) -> None:
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid: Tuple[str, ...]) -> object:
+        if pid[0] == "tree":
+            return self.shared[pid[1]]
+        if pid[0] == "module":
+            return modules[pid[1]]
+        return modules[pid[1]].members[symbols.intern(pid[2])]
+
+
+def detach(analysis: loxanalysis.Walker, interpreter: Optional[loxinterpreter.Interpreter]) -> loxanalysis.Walker:
+    """ Return copy of analysis working on interpreter
+        Its tables are copied, so continuing it leaves the original as it was """
+    result = copy.copy(analysis)
+    for name, value in vars(analysis).items():
+        if isinstance(value, dict):
+            setattr(result, name, {key: list(item) if isinstance(item, list) else item for key, item in value.items()})
+        elif isinstance(value, (list, set)):
+            setattr(result, name, type(value)(value))
+    result.interpreter = interpreter
+    return result
+
+
+def snapshot(source: str, tail_calls: bool = True) -> Image:
+    """ Run prelude source and return image of the globals it leaves
+        LoxCompileError or LoxRuntimeError if the prelude fails, LoxImageError if a global
+        holds a value that cannot be saved, such as an open file """
+    statements, compiler, analyses = loxprogram.analyse(source, tail_calls)
+    program = loxprogram.Program(statements, compiler)
+    interpreter = program.interpreter()
+    try:
+        for statement in program.statements:
+            interpreter.execute(statement)
+    finally:
+        interpreter.output.flush()
+    values: Dict[int, object] = {symbol_id: value for symbol_id, value in interpreter.globals.values.items()
+                                 if value is not loxglobals.core.members.get(symbol_id)}
+    bound = {declaration: (direct.owner, direct.function)
+             for declaration, direct in interpreter.direct_methods.items() if direct.owner is not None}
+    heap = io.BytesIO()
+    shared: List[object] = []
+    try:
+        HeapPickler(heap, shared).dump((values, interpreter.memos, bound, interpreter.super_methods))
+    except (pickle.PicklingError, TypeError, AttributeError) as error:
+        raise LoxImageError(f"Cannot save globals of prelude: {error}")
+    return Image(source, program, analyses, heap.getvalue(), shared)
+
+
+def load(path: str) -> Image:
+    """ Return image read from file
+        Where the symbols interned so far differ from the image's, its prelude is run again """
+    try:
+        with open(path, "rb") as image_file:
+            image = pickle.load(image_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as error:
+        raise LoxImageError(f"Cannot load image {path}: {error}")
+    if not isinstance(image, Image) or image.version != Image.VERSION:
+        raise LoxImageError(f"{path} is not an image of this version.")
+    common: int = min(len(symbols.names), len(image.names))
+    if symbols.names[:common] != image.names[:common]:
+        return snapshot(image.source, image.tail_calls_enabled)
+    for name in image.names[common:]:
+        symbols.intern(name)
+    return image
@@ -1,28 +1,76 @@
-from typing import List, Dict, Union, Optional, Any
+from typing import List, Dict, Set, Union, Optional, Any, Tuple, Callable
 
 import loxExprAST
 import loxStmtAST
+import loxanalysis
 import loxcallable
 import loxclass
 import loxenvironment
 import loxglobals
+import loxnative
+import loxnumber
+import loxoutput
+import loxrope
+import loxsymbol
 import loxtoken
-from loxerror import LoxRuntimeError, Return, raise_error
+import loxvector
+from loxerror import LoxRuntimeError, LoxNativeError, Return, raise_error
 
 
 class Interpreter:
     tokentypes = loxtoken.TokenType
+    FREE_LIST_SIZE: int = 256  # most environments kept for reuse
 
-    def __init__(self):
+    DEFAULT_SLICE: int = 10000  # steps between calls of on_slice
 
-        self.globals: loxenvironment.Environment = loxglobals.Globals().globals
+    def __init__(self, tail_calls: bool = True, memoize: bool = True, output: Optional[loxoutput.Output] = None,
+                 max_steps: Optional[int] = None, on_slice: Optional[Callable[[], None]] = None,
+                 slice_steps: int = DEFAULT_SLICE, sandbox: bool = False):
+
+        # Sandboxed interpreters get no natives reading or writing files or stdin
+        self.globals: loxenvironment.Environment = loxglobals.Globals(sandbox).globals
+        self.output: loxoutput.Output = output if output is not None else loxoutput.Output()
         self.environment: loxenvironment.Environment = self.globals
-        self.locals: Dict[loxExprAST.Expr, int] = dict()
+        self.had_runtime_error: bool = False  # set when interpret stopped on an error
+        # Fuel metering, off unless there is a step limit or a scheduler. Loop iterations and
+        # calls burn fuel, handed out a slice at a time from a budget (None for no limit).
+        # After each slice on_slice is called, so a scheduler can run other programs
+        self.metered: bool = max_steps is not None or on_slice is not None
+        self.budget: Optional[int] = max_steps
+        self.on_slice = on_slice
+        self.slice_steps: int = slice_steps
+        self.fuel: int = 0  # steps left in the current slice, the first step fills it
+        self.locals: Dict[loxExprAST.Expr, Tuple[int, int]] = dict()  # (depth, slot) of local variables
+        # Closure conversion: captures of each function, references to upvalues and
+        # the captured cells of the function being executed
+        self.closures: Dict[loxStmtAST.Function, List[Tuple[bool, int, int]]] = dict()
+        self.upvalue_refs: Dict[loxExprAST.Expr, int] = dict()
+        self.upvalues: List[loxenvironment.Cell] = []
+        # Block and call environments are never captured (closures hold cells) so they are recycled
+        self.free_environments: List[loxenvironment.LocalEnvironment] = []
+        # Return statements of calls in tail position, run without growing the stack.
+        # Left empty when disabled, so every call shows in Python tracebacks
+        self.tail_calls_enabled: bool = tail_calls
+        self.tail_calls: Set[loxStmtAST.Return] = set()
+        # Pure functions found by loxanalysis.PurityAnalysis and their shared result caches
+        self.memoize: bool = memoize
+        self.pure_functions: Set[loxStmtAST.Function] = set()
+        self.memos: Dict[loxStmtAST.Function, loxcallable.Memo] = dict()
+        # Inline caches for Get and Set: last shape seen and its slot index or method
+        self.property_cache: Dict[loxExprAST.Expr, Tuple[loxclass.Shape, Any, Any]] = dict()
+        # super expressions of each class and their targets, bound when the class is created
+        self.supers: Dict[loxStmtAST.Class, List[loxExprAST.Super]] = dict()
+        self.super_this: Dict[loxExprAST.Super, loxExprAST.This] = dict()
+        self.super_methods: Dict[loxExprAST.Super, Tuple[Optional[loxclass.LoxClass],
+                                                         Optional[loxcallable.LoxFunction]]] = dict()
+        # Devirtualised method calls, filled in by loxanalysis.ClassHierarchyAnalysis
+        self.direct_calls: Dict[loxExprAST.Call, loxanalysis.DirectMethod] = dict()
+        self.direct_methods: Dict[loxStmtAST.Function, loxanalysis.DirectMethod] = dict()
 
     # ---------------------------------------------------------------------------------
 
     def visit_block_stmt(self, stmt: loxStmtAST.Block) -> None:
-        self.execute_block(stmt.statements, loxenvironment.Environment(self.environment))
+        self.execute_block(stmt.statements, self.new_environment(self.environment))
         return None
 
     def visit_class_stmt(self, stmt: loxStmtAST.Class) -> None:
@@ -31,51 +79,81 @@ class Interpreter:
             superclass = self.evaluate(stmt.superclass)
             if not isinstance(superclass, loxclass.LoxClass):
                 raise_error(LoxRuntimeError, stmt.superclass.name, "Superclass must be a class.")
-        self.environment.define(stmt.name.lexeme, None)
+        key = self.environment.define(stmt.name.symbol_id, None)
         if stmt.superclass is not None:
-            self.environment = loxenvironment.Environment(self.environment)
-            self.environment.define("super", superclass)
-        methods: Dict[str, loxcallable.LoxFunction] = dict()
+            self.environment = loxenvironment.LocalEnvironment(self.environment)
+            self.environment.define(loxsymbol.SUPER, superclass)
+        methods: Dict[int, loxcallable.LoxFunction] = dict()
         for method in stmt.methods:
-            function = loxcallable.LoxFunction(method, self.environment, method.name.lexeme == "init")
-            methods[method.name.lexeme] = function
+            function = loxcallable.LoxFunction(method, self.capture(method), method.name.symbol_id == loxsymbol.INIT)
+            methods[method.name.symbol_id] = function
         klass: loxclass.LoxClass = loxclass.LoxClass(stmt.name.lexeme, superclass, methods)
+        for method in stmt.methods:
+            direct: Optional[loxanalysis.DirectMethod] = self.direct_methods.get(method)
+            if direct is not None:
+                direct.owner = klass
+                direct.function = methods[method.name.symbol_id]
         if stmt.superclass is not None:
             self.environment = self.environment.enclosing
-        self.environment.assign(stmt.name, klass)
+            self.bind_supers(stmt, superclass)
+        self.environment.assign_at(0, key, klass)
         return None
 
     def visit_var_stmt(self, stmt: loxStmtAST.Var) -> None:
         value: Optional[loxExprAST.Expr] = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
-        self.environment.define(stmt.name.lexeme, value)
+        self.environment.define(stmt.name.symbol_id, value)
         return None
 
     def visit_while_stmt(self, stmt: loxStmtAST.While) -> None:
+        if self.metered:
+            return self.metered_while(stmt)
         while self.is_true(self.evaluate(stmt.condition)):
             # self.execute_list(stmt.body.statements)
             self.visit_block_stmt(stmt.body)
         return None
 
+    def metered_while(self, stmt: loxStmtAST.While) -> None:
+        """ While loop burning fuel at each back edge
+            Lookups are hoisted out of the loop so that the charge is most of its extra cost """
+        condition: loxExprAST.Expr = stmt.condition
+        body: loxStmtAST.Block = stmt.body
+        evaluate = self.evaluate
+        is_true = self.is_true
+        visit_block_stmt = self.visit_block_stmt
+        while is_true(evaluate(condition)):
+            visit_block_stmt(body)
+            self.fuel -= 1
+            if self.fuel < 0:
+                self.refuel(stmt.keyword)
+        return None
+
     def visit_assign_expr(self, expr: loxExprAST.Assign) -> loxExprAST.Expr:
         value: loxExprAST.Expr = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+        location = self.locals.get(expr)
+        if location is not None:
+            self.environment.assign_at(location[0], location[1], value)
+            return value
+        index = self.upvalue_refs.get(expr)
+        if index is not None:
+            self.upvalues[index].value = value
         else:
             self.globals.assign(expr.name, value)
         return value
 
     def visit_print_stmt(self, stmt: loxStmtAST.Print) -> None:
         value: loxExprAST.Expr = self.evaluate(stmt.expression)
-        print(value)
+        self.output.print(value)
         return None
 
     def visit_return_stmt(self, stmt: loxStmtAST.Return) -> None:
         value: Optional[loxExprAST.Expr] = None
         if stmt.value is not None:
-            value = self.evaluate(stmt.value)
+            if stmt in self.tail_calls:
+                value = self.tail_call(stmt.value)
+            else:
+                value = self.evaluate(stmt.value)
         raise Return(value)
 
     def visit_expression_stmt(self, stmt: loxStmtAST.Expression) -> None:
@@ -83,8 +161,15 @@ class Interpreter:
         return None
 
     def visit_function_stmt(self, stmt: loxStmtAST.Function) -> None:
-        funct: loxcallable.LoxFunction = loxcallable.LoxFunction(stmt, self.environment, False)
-        self.environment.define(stmt.name.lexeme, funct)
+        # Define name first so a recursive function can capture itself
+        key = self.environment.define(stmt.name.symbol_id, None)
+        funct: loxcallable.LoxFunction = loxcallable.LoxFunction(stmt, self.capture(stmt), False)
+        if self.memoize and stmt in self.pure_functions:
+            # The result depends only on the arguments, so all closures share one cache
+            if stmt not in self.memos:
+                self.memos[stmt] = loxcallable.Memo()
+            funct.memo = self.memos[stmt]
+        self.environment.assign_at(0, key, funct)
         return None
 
     def visit_if_stmt(self, stmt: loxStmtAST.If) -> None:
@@ -105,7 +190,7 @@ class Interpreter:
     def visit_logical_expr(self, expr) -> bool:
         left: bool = self.evaluate(expr.left)
 
-        if expr.operator.type == Interpreter.tokentypes.OR:
+        if expr.operator.tok_type == Interpreter.tokentypes.OR:
             if self.is_true(left):
                 return left
         elif not self.is_true(left):
@@ -117,17 +202,24 @@ class Interpreter:
         if not isinstance(set_object, loxclass.LoxInstance):
             raise_error(LoxRuntimeError, expr.name, "Only instances have fields.")
         value = self.evaluate(expr.value)
-        set_object.set(expr.name, value)
+        shape: loxclass.Shape = set_object.shape
+        cached = self.property_cache.get(expr)
+        if cached is None or cached[0] is not shape:
+            index: Optional[int] = shape.index.get(expr.name.symbol_id)
+            if index is None:
+                cached = (shape, shape.add(expr.name.symbol_id), None)
+            else:
+                cached = (shape, shape, index)
+            self.property_cache[expr] = cached
+        if cached[2] is None:
+            set_object.shape = cached[1]
+            set_object.slots.append(value)
+        else:
+            set_object.slots[cached[2]] = value
         return value
 
     def visit_super_expr(self, expr: loxExprAST.Super):
-        distance = self.locals[expr]
-        superclass = self.environment.get_at(distance, "super")
-        # "this" is always one level nearer than "super"'s environment.
-        get_object = self.environment.get_at(distance - 1, "this")
-        method = superclass.find_method(expr.method.lexeme)
-        if method is None:
-            raise_error(LoxRuntimeError, expr.method, "Undefined property '" + expr.method.lexeme + "'.")
+        method, get_object = self.lookup_super(expr)
         return method.bind(get_object)
 
     def visit_this_expr(self, expr: loxExprAST.This) -> object:
@@ -136,87 +228,249 @@ class Interpreter:
     def visit_grouping_expr(self, expr) -> Union[float, str, bool]:
         return self.evaluate(expr.expression)
 
-    def visit_binary_expr(self, expr) -> Optional[Union[float, str, bool]]:
-        left: Union[float, str, bool] = self.evaluate(expr.left)
-        right: Union[float, str, bool] = self.evaluate(expr.right)
-
-        if expr.operator.tok_type == Interpreter.tokentypes.MINUS:
+    def visit_binary_expr(self, expr) -> Optional[Union[loxnumber.Number, str, bool]]:
+        left: Union[loxnumber.Number, str, bool] = self.evaluate(expr.left)
+        right: Union[loxnumber.Number, str, bool] = self.evaluate(expr.right)
+        operator: loxtoken.TokenType = expr.operator.tok_type
+
+        if type(left) is int and type(right) is int:
+            # Exact int arithmetic, results past MAX_INT become float as doubles would
+            result = loxnumber.int_operations[operator](left, right)
+            if -loxnumber.MAX_INT <= result <= loxnumber.MAX_INT:
+                return result
+            return float(result)
+
+        if type(left) is loxvector.LoxVector or type(right) is loxvector.LoxVector:
+            if operator not in (Interpreter.tokentypes.EQUAL_EQUAL, Interpreter.tokentypes.BANG_EQUAL):
+                try:
+                    return loxvector.binary(operator, left, right)
+                except LoxNativeError as error:
+                    raise_error(LoxRuntimeError, expr.operator, error.message)
+
+        # Python mixes int and float exactly as doubles, so no conversions are needed
+        if operator == Interpreter.tokentypes.MINUS:
             if self.check_number_operands(expr.operator, left, right):
-                return float(left) - float(right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.SLASH:
+                return left - right
+        elif operator == Interpreter.tokentypes.SLASH:
             if self.check_number_operands(expr.operator, left, right):
-                return float(left) / float(right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.STAR:
+                return loxnumber.divide(left, right)
+        elif operator == Interpreter.tokentypes.STAR:
             if self.check_number_operands(expr.operator, left, right):
-                return float(left) * float(right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.PLUS:
-            if isinstance(left, float) and isinstance(right, float):
-                return left + right
-            elif isinstance(left, str) and isinstance(right, str):
+                return left * right
+        elif operator == Interpreter.tokentypes.PLUS:
+            if loxnumber.is_number(left) and loxnumber.is_number(right):
                 return left + right
+            elif isinstance(left, (str, loxrope.LoxRope)) and isinstance(right, (str, loxrope.LoxRope)):
+                return loxrope.concat(left, right)
             else:
                 raise_error(LoxRuntimeError, expr.operator, "Operands must both be a number or a string.")
 
-        elif expr.operator.tok_type == Interpreter.tokentypes.GREATER:
+        elif operator == Interpreter.tokentypes.GREATER:
             if self.check_number_operands(expr.operator, left, right):
-                return float(left) > float(right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.GREATER_EQUAL:
+                return left > right
+        elif operator == Interpreter.tokentypes.GREATER_EQUAL:
             if self.check_number_operands(expr.operator, left, right):
-                return float(left) >= float(right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.LESS:
+                return left >= right
+        elif operator == Interpreter.tokentypes.LESS:
             if self.check_number_operands(expr.operator, left, right):
-                return float(left) < float(right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.LESS_EQUAL:
+                return left < right
+        elif operator == Interpreter.tokentypes.LESS_EQUAL:
             if self.check_number_operands(expr.operator, left, right):
-                return float(left) <= float(right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.EQUAL_EQUAL:
+                return left <= right
+        elif operator == Interpreter.tokentypes.EQUAL_EQUAL:
             return self.is_equal(left, right)
-        elif expr.operator.tok_type == Interpreter.tokentypes.BANG_EQUAL:
+        elif operator == Interpreter.tokentypes.BANG_EQUAL:
             return not self.is_equal(left, right)
 
         return None
 
     def visit_call_expr(self, expr: loxExprAST.Call) -> object:
-        callee: loxcallable.LoxFunction = self.evaluate(expr.callee)
-        arguments: List[object] = []
-        for arg in expr.arguments:
-            arguments.append(self.evaluate(arg))
-        if not isinstance(callee, loxcallable.LoxCallable) and loxcallable.LoxCallable not in callee.__bases__:
-            raise_error(LoxRuntimeError, expr.paren, "Can only call functions and classes.")
-
-        # funct: loxcallable.LoxFunction = callee
-        if len(arguments) != callee.arity():
-            raise_error(LoxRuntimeError, expr.paren,
-                        "Expected " + str(callee.arity()) + " arguments but got "
-                        + str(len(arguments)) + ".")
-        return callee.call(self, arguments)
+        callee, instance, arguments = self.prepare_call(expr)
+        if type(callee) is loxcallable.LoxFunction:
+            return callee.invoke(self, callee.instance if instance is None else instance, arguments)
+        return self.call_native(callee, instance, arguments, expr.paren)
 
     def visit_get_expr(self, expr: loxExprAST.Get):
         get_object = self.evaluate(expr.get_object)
         if isinstance(get_object, loxclass.LoxInstance):
-            return get_object.get(expr.name)
+            index, method = self.lookup_property(get_object, expr)
+            if method is None:
+                return get_object.slots[index]
+            return method.bind(get_object)
+        if isinstance(get_object, loxnative.NativeObject):
+            return self.native_method(get_object, expr.name).bind(get_object)
+        if isinstance(get_object, loxnative.NativeModule):
+            return self.module_member(get_object, expr.name)
         raise_error(LoxRuntimeError, expr.name, "Only instances have properties.")
 
     def visit_unary_expr(self, expr: loxExprAST.Unary) -> Union[float, bool, None]:
         right: loxExprAST.Expr = self.evaluate(expr.right)
 
         if expr.operator.tok_type == Interpreter.tokentypes.MINUS:
+            if right == 0 and type(right) is int:
+                return -0.0  # an int zero stands for +0.0
             if self.check_number_operands(expr.operator, right):
-                assert isinstance(right, float)
-                return float(right)
+                return -right
         elif expr.operator.tok_type == Interpreter.tokentypes.BANG:
-            return self.is_true(right)
+            return not self.is_true(right)
         return None
 
     # ---------------------------------------------------------------------------------
 
+    def prepare_call(self, expr: loxExprAST.Call) -> Tuple[Any, Optional[loxclass.LoxInstance], List[object]]:
+        """ Evaluate and check callee and arguments of call
+            Methods called as obj.name(args) or super.name(args) come back unbound with
+            their receiver, so no bound method is created. Other callees come with None """
+        if isinstance(expr.callee, loxExprAST.Get):
+            get_object = self.evaluate(expr.callee.get_object)
+            direct: Optional[loxanalysis.DirectMethod] = self.direct_calls.get(expr)
+            # Receiver guard: method name has one implementation and is never a field
+            if direct is not None and type(get_object) is loxclass.LoxInstance \
+                    and direct.owner in get_object.klass.ancestors:
+                return direct.function, get_object, self.evaluate_arguments(expr.arguments)
+            if isinstance(get_object, loxnative.NativeObject):
+                native: loxnative.NativeFunction = self.native_method(get_object, expr.callee.name)
+                arguments: List[object] = self.evaluate_arguments(expr.arguments)
+                self.check_arity(native, arguments, expr.paren)
+                return native, get_object, arguments
+            if isinstance(get_object, loxnative.NativeModule):
+                callee = self.module_member(get_object, expr.callee.name)
+                arguments = self.evaluate_arguments(expr.arguments)
+                return self.check_callable(callee, arguments, expr.paren), None, arguments
+            if not isinstance(get_object, loxclass.LoxInstance):
+                raise_error(LoxRuntimeError, expr.callee.name, "Only instances have properties.")
+            index, method = self.lookup_property(get_object, expr.callee)
+            if method is None:  # field read before the arguments run, they may change it
+                callee = get_object.slots[index]
+                arguments = self.evaluate_arguments(expr.arguments)
+                return self.check_callable(callee, arguments, expr.paren), None, arguments
+            arguments = self.evaluate_arguments(expr.arguments)
+            self.check_arity(method, arguments, expr.paren)
+            return method, get_object, arguments
+        if isinstance(expr.callee, loxExprAST.Super):
+            method, get_object = self.lookup_super(expr.callee)
+            arguments = self.evaluate_arguments(expr.arguments)
+            self.check_arity(method, arguments, expr.paren)
+            return method, get_object, arguments
+        callee = self.evaluate(expr.callee)
+        arguments = self.evaluate_arguments(expr.arguments)
+        return self.check_callable(callee, arguments, expr.paren), None, arguments
+
+    def call_native(self, callee: Any, instance: object, arguments: List[object], paren: loxtoken.Token) -> object:
+        """ Call anything but a Lox function: natives, methods of native objects and classes
+            Errors from Python functions are reported at the call """
+        for index, argument in enumerate(arguments):
+            if type(argument) is loxrope.LoxRope:  # Python functions only see flat strings
+                arguments[index] = str(argument)
+        try:
+            if instance is not None:
+                return callee.invoke(self, instance, arguments)
+            if type(callee) is loxnative.NativeFunction and callee.direct:
+                return callee.function(*arguments)  # fast path for Python builtins
+            return callee.call(self, arguments)
+        except LoxNativeError as error:
+            raise_error(LoxRuntimeError, paren, error.message)
+
+    @staticmethod
+    def native_method(native: loxnative.NativeObject, name: loxtoken.Token) -> loxnative.NativeFunction:
+        """ Return method of native object """
+        method: Optional[loxnative.NativeFunction] = native.native_class.find_method(name.symbol_id)
+        if method is None:
+            raise_error(LoxRuntimeError, name, "Undefined property '" + name.lexeme + "'.")
+        return method
+
+    @staticmethod
+    def module_member(module: loxnative.NativeModule, name: loxtoken.Token) -> object:
+        """ Return member of native module """
+        try:
+            return module.get(name.symbol_id)
+        except LoxNativeError as error:
+            raise_error(LoxRuntimeError, name, error.message)
+
+    def tail_call(self, expr: loxExprAST.Call) -> object:
+        """ Evaluate call in tail position
+            A Lox function is not called but returned as TailCall, for the
+            LoxFunction being returned from to run in its own loop """
+        callee, instance, arguments = self.prepare_call(expr)
+        if isinstance(callee, loxcallable.LoxFunction):
+            return loxcallable.TailCall(callee, callee.instance if instance is None else instance, arguments)
+        return self.call_native(callee, instance, arguments, expr.paren)
+
+    def lookup_property(self, instance: loxclass.LoxInstance, expr: loxExprAST.Get) \
+            -> Tuple[Optional[int], Optional[loxcallable.LoxFunction]]:
+        """ Return (slot index, None) for a field or (None, method) for a method
+            Cached per Get node on the instance shape. The root shape belongs to one class
+            so a shape hit also fixes the method """
+        shape: loxclass.Shape = instance.shape
+        cached = self.property_cache.get(expr)
+        if cached is not None and cached[0] is shape:
+            return cached[1], cached[2]
+        index: Optional[int] = shape.index.get(expr.name.symbol_id)
+        method: Optional[loxcallable.LoxFunction] = None
+        if index is None:
+            method = instance.klass.find_method(expr.name.symbol_id)
+            if method is None:
+                raise_error(LoxRuntimeError, expr.name, "Undefined property '" + expr.name.lexeme + "'.")
+        self.property_cache[expr] = (shape, index, method)
+        return index, method
+
+    def bind_supers(self, stmt: loxStmtAST.Class, superclass: loxclass.LoxClass) -> None:
+        """ Resolve super.method targets of class once, when the class is created
+            A class statement run again with another superclass leaves its super
+            expressions to be looked up dynamically (superclass entry None) """
+        for expr in self.supers.get(stmt, []):
+            method: Optional[loxcallable.LoxFunction] = superclass.find_method(expr.method.symbol_id)
+            cached = self.super_methods.get(expr)
+            if cached is None:
+                self.super_methods[expr] = (superclass, method)
+            elif cached[0] is not superclass:
+                self.super_methods[expr] = (None, None)
+
+    def lookup_super(self, expr: loxExprAST.Super) -> Tuple[loxcallable.LoxFunction, loxclass.LoxInstance]:
+        """ Return target method of super expression and the current 'this' """
+        superclass, method = self.super_methods[expr]
+        if superclass is None:
+            superclass = self.lookup_variable(expr.keyword, expr)
+            method = superclass.find_method(expr.method.symbol_id)
+        if method is None:
+            raise_error(LoxRuntimeError, expr.method, "Undefined property '" + expr.method.lexeme + "'.")
+        return method, self.visit_this_expr(self.super_this[expr])
+
+    def check_callable(self, callee: Any, arguments: List[object], paren: loxtoken.Token) -> Any:
+        """ Check callee can be called with evaluated arguments and return it """
+        if not isinstance(callee, loxcallable.LoxCallable):
+            raise_error(LoxRuntimeError, paren, "Can only call functions and classes.")
+        self.check_arity(callee, arguments, paren)
+        return callee
+
+    def evaluate_arguments(self, args: List[loxExprAST.Expr]) -> List[object]:
+        """ Evaluate call arguments in order """
+        arguments: List[object] = []
+        for arg in args:
+            arguments.append(self.evaluate(arg))
+        return arguments
+
+    @staticmethod
+    def check_arity(callee: Any, arguments: List[object], paren: loxtoken.Token) -> None:
+        """ Check number of arguments matches callee """
+        if len(arguments) != callee.arity():
+            raise_error(LoxRuntimeError, paren,
+                        "Expected " + str(callee.arity()) + " arguments but got "
+                        + str(len(arguments)) + ".")
+
+    # ---------------------------------------------------------------------------------
+
     def interpret(self, stmts: List[loxStmtAST.Stmt]) -> None:
         """ Main entry point """
         try:
             for statement in stmts:
                 self.execute(statement)
         except RuntimeError as error:
+            self.had_runtime_error = True
+            self.output.flush()
             print(error)
+        finally:
+            self.output.flush()
 
     def execute(self, stmt: loxStmtAST.Stmt) -> None:
         """ Execute statement """
@@ -227,27 +481,92 @@ class Interpreter:
         for st in stmt:
             st.accept(self)
 
-    def resolve(self, expr: loxExprAST.Expr, depth: int) -> None:
-        """ Called from resolver to store depth """
-        self.locals[expr] = depth
-
-    def execute_block(self, stmt: List[loxStmtAST.Stmt], environment: loxenvironment.Environment) -> None:
-        """ Execute block stateemt - called by visit_block_stmt """
-        previous_env: loxenvironment.Environment = self.environment
+    def refuel(self, token: loxtoken.Token) -> None:
+        """ Called by a step that found no fuel left
+            Stops the program when the budget is spent, otherwise yields to the scheduler
+            and takes the next slice, charging this step to it """
+        if self.budget == 0:
+            raise_error(LoxRuntimeError, token, "Step limit exceeded.")
+        if self.on_slice is not None:
+            self.on_slice()
+        fuel: int = self.slice_steps
+        if self.budget is not None:
+            fuel = min(fuel, self.budget)
+            self.budget -= fuel
+        self.fuel = fuel - 1
+
+    def resolve(self, expr: loxExprAST.Expr, depth: int, slot: int) -> None:
+        """ Called from resolver to store depth and slot """
+        self.locals[expr] = (depth, slot)
+
+    def resolve_tail_call(self, stmt: loxStmtAST.Return) -> None:
+        """ Called from resolver to mark return of a call in tail position """
+        if self.tail_calls_enabled:
+            self.tail_calls.add(stmt)
+
+    def resolve_upvalue(self, expr: loxExprAST.Expr, index: int) -> None:
+        """ Called from resolver to store upvalue index of captured variable """
+        self.upvalue_refs[expr] = index
+
+    def resolve_closure(self, stmt: loxStmtAST.Function, captures: List[Tuple[bool, int, int]]) -> None:
+        """ Called from resolver to store variables captured by function """
+        self.closures[stmt] = captures
+
+    def resolve_super_this(self, expr: loxExprAST.Super, this_expr: loxExprAST.This) -> None:
+        """ Called from resolver to store resolved 'this' of super expression """
+        self.super_this[expr] = this_expr
+
+    def resolve_supers(self, stmt: loxStmtAST.Class, exprs: List[loxExprAST.Super]) -> None:
+        """ Called from resolver to store super expressions used in class """
+        self.supers[stmt] = exprs
+
+    def execute_block(self, stmt: List[loxStmtAST.Stmt], environment: loxenvironment.LocalEnvironment,
+                      upvalues: Optional[List[loxenvironment.Cell]] = None) -> None:
+        """ Execute block stateemt - called by visit_block_stmt
+            Function calls also pass the upvalues of the function
+            environment goes back on the free list afterwards """
+        previous_env: Any = self.environment
+        previous_upvalues: List[loxenvironment.Cell] = self.upvalues
         try:
             self.environment = environment
+            if upvalues is not None:
+                self.upvalues = upvalues
             for statement in stmt:
                 self.execute(statement)
         finally:
             self.environment = previous_env
+            self.upvalues = previous_upvalues
+            if len(self.free_environments) < Interpreter.FREE_LIST_SIZE:
+                environment.values.clear()
+                self.free_environments.append(environment)
+
+    def new_environment(self, enclosing: Any) -> loxenvironment.LocalEnvironment:
+        """ Return environment for block or call, from the free list if possible """
+        if self.free_environments:
+            environment: loxenvironment.LocalEnvironment = self.free_environments.pop()
+            environment.reset(enclosing)
+            return environment
+        return loxenvironment.LocalEnvironment(enclosing)
+
+    def capture(self, declaration: loxStmtAST.Function) -> List[loxenvironment.Cell]:
+        """ Collect cells of variables captured by function created in current environment """
+        cells: List[loxenvironment.Cell] = []
+        for is_local, index, slot in self.closures.get(declaration, []):
+            if is_local:
+                cells.append(self.environment.ancestor(index).capture(slot))
+            else:
+                cells.append(self.upvalues[index])
+        return cells
 
     def lookup_variable(self, name: loxtoken.Token, expr: loxExprAST.Expr) -> object:
         """ Get variable (at resolved location) """
-        distance: int = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
-        else:
-            return self.globals.get(name)
+        location: Tuple[int, int] = self.locals.get(expr)
+        if location is not None:
+            return self.environment.get_at(location[0], location[1])
+        index: int = self.upvalue_refs.get(expr)
+        if index is not None:
+            return self.upvalues[index].value
+        return self.globals.get(name)
 
     def evaluate(self, expr: loxExprAST.Expr) -> Any:
         """ Evaluate expression """
@@ -273,14 +592,11 @@ class Interpreter:
         return o1 == o2
 
     @staticmethod
-    def check_number_operands(operator: loxtoken.Token, op1: Any, op2: Any = None) -> bool:
-        """ Check if one or two operands are numeric (float) """
-        if op2 is None:
-            if isinstance(op1, float):
-                return True
-            raise_error(LoxRuntimeError, operator, "Operand must be a number.")
-        else:
-            if isinstance(op1, float) and isinstance(op2, float):
-                return True
-            raise_error(LoxRuntimeError, operator, "Both operands must be a number.")
-        return False
+    def check_number_operands(operator: loxtoken.Token, *operands: Any) -> bool:
+        """ Check if one or two operands are numeric (float or int) """
+        for operand in operands:
+            if type(operand) is not float and type(operand) is not int:
+                if len(operands) == 1:
+                    raise_error(LoxRuntimeError, operator, "Operand must be a number.")
+                raise_error(LoxRuntimeError, operator, "Both operands must be a number.")
+        return True
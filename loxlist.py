@@ -0,0 +1,146 @@
+from typing import List, TYPE_CHECKING
+
+from loxerror import LoxNativeError
+from loxnumber import is_number
+from loxrope import flatten
+from loxnative import NativeClass, NativeObject, check_callable, check_index, check_number, check_string, stringify
+
+if TYPE_CHECKING:
+    import loxinterpreter
+
+
+class LoxList(NativeObject):
+    """ Lox list, a Python list with methods called from lox
+        Bulk operations run their loops in Python """
+
+    __slots__ = ("items",)
+
+    native_class: NativeClass = NativeClass("List")
+
+    def __init__(self, items: List[object] = None) -> None:
+        if items is None:
+            items = []
+        self.items = items
+
+    def index(self, index: object) -> int:
+        """ Return index as int if it is in range """
+        position: int = check_index(index, "List index")
+        if not 0 <= position < len(self.items):
+            raise LoxNativeError("List index out of range.")
+        return position
+
+    def __str__(self) -> str:
+        """ Return list as string """
+        return "[" + ", ".join(stringify(item) for item in self.items) + "]"
+
+
+methods: NativeClass = LoxList.native_class
+
+
+@methods.native("get", 1)
+def get(lox_list: LoxList, index: object) -> object:
+    """ Return item at index """
+    return lox_list.items[lox_list.index(index)]
+
+
+@methods.native("set", 2)
+def set_item(lox_list: LoxList, index: object, value: object) -> object:
+    """ Replace item at index, return value """
+    lox_list.items[lox_list.index(index)] = value
+    return value
+
+
+@methods.native("append", 1)
+def append(lox_list: LoxList, value: object) -> None:
+    """ Add value at end """
+    lox_list.items.append(value)
+
+
+@methods.native("pop", 0)
+def pop(lox_list: LoxList) -> object:
+    """ Remove and return last item """
+    if not lox_list.items:
+        raise LoxNativeError("Pop from empty list.")
+    return lox_list.items.pop()
+
+
+@methods.native("length", 0)
+def length(lox_list: LoxList) -> float:
+    """ Return number of items """
+    return float(len(lox_list.items))
+
+
+@methods.native("slice", 2)
+def slice_items(lox_list: LoxList, start: object, end: object) -> LoxList:
+    """ Return new list of items from start up to end """
+    return LoxList(lox_list.items[check_index(start, "Start"):check_index(end, "End")])
+
+
+@methods.native("indexOf", 1, with_interpreter=True)
+def index_of(interpreter: 'loxinterpreter.Interpreter', lox_list: LoxList, value: object) -> float:
+    """ Return position of first item equal to value or -1 """
+    for position, item in enumerate(lox_list.items):
+        if interpreter.is_equal(item, value):
+            return float(position)
+    return -1.0
+
+
+@methods.native("reverse", 0)
+def reverse(lox_list: LoxList) -> None:
+    """ Reverse items in place """
+    lox_list.items.reverse()
+
+
+@methods.native("sort", 0)
+def sort(lox_list: LoxList) -> None:
+    """ Sort numbers or strings in place """
+    items: List[object] = lox_list.items
+    if all(is_number(item) for item in items) or all(isinstance(item, str) for item in items):
+        items.sort()
+    else:
+        raise LoxNativeError("Can only sort lists of numbers or of strings.")
+
+
+@methods.native("sum", 0)
+def sum_items(lox_list: LoxList) -> float:
+    """ Return total of numbers """
+    return sum((check_number(item, "List item") for item in lox_list.items), 0.0)
+
+
+@methods.native("join", 1)
+def join(lox_list: LoxList, separator: object) -> str:
+    """ Return items as printed, separated by separator """
+    return check_string(separator, "Separator").join(stringify(item) for item in lox_list.items)
+
+
+@methods.native("map", 1, with_interpreter=True)
+def map_items(interpreter: 'loxinterpreter.Interpreter', lox_list: LoxList, function: object) -> LoxList:
+    """ Return new list of function applied to each item """
+    call = check_callable(function, 1, "Map argument").call
+    return LoxList([flatten(call(interpreter, [item])) for item in lox_list.items])
+
+
+@methods.native("filter", 1, with_interpreter=True)
+def filter_items(interpreter: 'loxinterpreter.Interpreter', lox_list: LoxList, function: object) -> LoxList:
+    """ Return new list of items for which function is truthy """
+    call = check_callable(function, 1, "Filter argument").call
+    return LoxList([item for item in lox_list.items if interpreter.is_true(call(interpreter, [item]))])
+
+
+@methods.native("forEach", 1, with_interpreter=True)
+def for_each(interpreter: 'loxinterpreter.Interpreter', lox_list: LoxList, function: object) -> None:
+    """ Call function with each item """
+    call = check_callable(function, 1, "ForEach argument").call
+    for item in lox_list.items:
+        call(interpreter, [item])
+
+
+@methods.native("reduce", 2, with_interpreter=True)
+def reduce_items(interpreter: 'loxinterpreter.Interpreter', lox_list: LoxList, function: object,
+                 initial: object) -> object:
+    """ Return result of combining items in order with function, starting from initial """
+    call = check_callable(function, 2, "Reduce argument").call
+    result: object = initial
+    for item in lox_list.items:
+        result = call(interpreter, [result, item])
+    return result
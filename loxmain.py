@@ -1,9 +1,13 @@
-from typing import List, TYPE_CHECKING
+from typing import List, Dict, Optional, TYPE_CHECKING
 import sys
 
 import ASTPrinter
+import loxanalysis
 import loxerror
+import loxdriver
+import loximage
 import loxinterpreter
+import loxoutput
 import loxparser
 import loxresolver
 import loxscanner
@@ -17,19 +21,60 @@ class Lox:
     """ Main program class
         Runs the Lox interpreter """
 
-    had_error: bool = False  # flag error to stop processing
+    options: List[str] = ["--no-tail-calls",  # keep every Lox call on the Python stack
+                          "--no-memoize",  # never cache results of pure functions
+                          "--csv"]  # records of --map are csv rows, not JSON lines
+
+    value_options: List[str] = ["--map",  # script to run over records of stdin
+                                "--fn",  # function of that script called per record
+                                "--max-steps",  # stop programs after this many loop iterations and calls
+                                "--image",  # start with the globals of a prelude image
+                                "--snapshot"]  # run script as prelude and save its globals to this image
 
     def __init__(self, args: List[str]) -> None:
 
-        self.scanner = loxscanner.Scanner()
-        self.parser = loxparser.Parser()
-        self.interpreter = loxinterpreter.Interpreter()
-        self.resolver = loxresolver.Resolver(self.interpreter)
+        values: Dict[str, str] = dict()
+        flags: List[str] = []
+        rest: List[str] = []
+        arg_list = iter(args)
+        for arg in arg_list:
+            if arg in Lox.value_options:
+                values[arg] = next(arg_list, "")
+            elif arg.startswith("--"):
+                flags.append(arg)
+            else:
+                rest.append(arg)
+        args = rest
+        self.reporter = loxerror.ErrorReporter()  # errors of the current source
+        self.scanner = loxscanner.Scanner(self.reporter)
+        self.parser = loxparser.Parser(self.reporter)
+        max_steps: str = values.get("--max-steps", "")
+        # Map mode keeps stdout for results, so script output goes to stderr
+        output = loxoutput.Output(sys.stderr.buffer) if "--map" in values else None
+        self.interpreter = loxinterpreter.Interpreter(tail_calls="--no-tail-calls" not in flags,
+                                                      memoize="--no-memoize" not in flags,
+                                                      output=output,
+                                                      max_steps=int(max_steps) if max_steps.isdigit() else None)
+        self.resolver = loxresolver.Resolver(self.interpreter, self.reporter)
+        self.analysis = loxanalysis.ClassHierarchyAnalysis(self.interpreter)
+        self.purity = loxanalysis.PurityAnalysis(self.interpreter)
         self.line_no: int = 0
 
-        if len(args) > 1:
-            print("Usage: pyLox [script]")
+        if len(args) > 1 or any(flag not in Lox.options for flag in flags) or \
+                ("--map" in values) != ("--fn" in values) or ("--map" in values and args) or \
+                ("--csv" in flags and "--map" not in values) or not all(values.values()) or \
+                (max_steps and not max_steps.isdigit()) or \
+                ("--snapshot" in values and (len(args) != 1 or "--map" in values or "--image" in values)):
+            print("Usage: pyLox [--no-tail-calls] [--no-memoize] [--max-steps n] [--image file] "
+                  "[script | --map script --fn name [--csv] | --snapshot file prelude]")
             sys.exit(1)
+        elif "--snapshot" in values:
+            self.snapshot(args[0], values["--snapshot"], "--no-tail-calls" not in flags)
+            return
+        if "--image" in values:
+            self.load_image(values["--image"])
+        if "--map" in values:
+            self.run_map(values["--map"], values["--fn"], "--csv" in flags)
         elif len(args) == 1:
             self.run_file(args[0])
         else:
@@ -42,6 +87,51 @@ class Lox:
         with open(file_name, 'r') as source_file:
             self.run(source_file.read())
 
+    def snapshot(self, file_name: str, image_name: str, tail_calls: bool):
+        """ Run prelude script and save the globals it leaves as image """
+
+        with open(file_name, 'r') as source_file:
+            source: str = source_file.read()
+        try:
+            loximage.snapshot(source, tail_calls).save(image_name)
+        except loxerror.LoxCompileError as error:
+            print(error)
+            sys.exit(65)
+        except loxerror.LoxRuntimeError as error:
+            print(error.report())
+            sys.exit(70)
+        except loxerror.LoxImageError as error:
+            print(error.message)
+            sys.exit(1)
+
+    def load_image(self, image_name: str):
+        """ Start interpreter with the globals of image
+            Its tables and analyses carry on from the prelude's """
+
+        try:
+            image = loximage.load(image_name)
+        except loxerror.LoxImageError as error:
+            print(error.message)
+            sys.exit(1)
+        self.analysis, self.purity = image.extend(self.interpreter)
+        image.install(self.interpreter)
+
+    def run_map(self, file_name: str, function_name: str, is_csv: bool):
+        """ Run function of script over each record of stdin, results to stdout
+            Script is compiled once, its interpreter stays warm for all records """
+
+        with open(file_name, 'r') as source_file:
+            statements = self.compile(source_file.read(), False)
+        if statements is None:
+            sys.exit(65)
+        self.interpreter.interpret(statements)
+        if self.interpreter.had_runtime_error:
+            sys.exit(70)
+        driver = loxdriver.RecordDriver(self.interpreter, function_name, is_csv)
+        driver.run(sys.stdin, loxoutput.Output(sys.stdout.buffer), sys.stderr)
+        if driver.errors:
+            print(f"{driver.errors} of {driver.records} records failed.", file=sys.stderr)
+
     def run_prompt(self):
         """ Run interactively from prompt """
 
@@ -50,26 +140,46 @@ class Lox:
             if line.lower() == "quit":
                 break
             self.run(line)
-            loxerror.had_error = False
 
     def run(self, source: str):
         """ Run interpreter """
 
+        statements = self.compile(source)
+        if statements:
+            self.interpreter.interpret(statements)
+
+    def compile(self, source: str, verbose: bool = True) -> Optional[List['loxStmtAST.Stmt']]:
+        """ Scan, parse, resolve and analyse source, None on error
+            Verbose prints the debug output of each pass """
+
+        self.reporter.reset()
         tokens: List[loxtoken.Token] = self.scanner.scan_tokens(source)
         statements: List[loxStmtAST.Stmt] = self.parser.parse(tokens, 0)
-        if loxerror.had_error:
-            return
+        if self.reporter.had_error:
+            return None
         if statements:
             self.resolver.resolve(statements)
-            print("ASTPrinter output ----------")
-            for stmt in statements:
-                print(ASTPrinter.ASTStmtPrinter().print(stmt))
-            print("ASTPrinter end -------------")
-            print()
-            print("Resolver output ------------")
-            for key in self.interpreter.locals:
-                print(ASTPrinter.ASTPrinter().print(key), self.interpreter.locals[key])
-            print("Resolver end ---------------")
-            print()
-
-            self.interpreter.interpret(statements)
+            if self.reporter.had_error:
+                return None
+            if verbose:
+                print("ASTPrinter output ----------")
+                for stmt in statements:
+                    print(ASTPrinter.ASTStmtPrinter().print(stmt))
+                print("ASTPrinter end -------------")
+                print()
+                print("Resolver output ------------")
+                for key in self.interpreter.locals:
+                    print(ASTPrinter.ASTPrinter().print(key), self.interpreter.locals[key])
+                for key in self.interpreter.upvalue_refs:
+                    print(ASTPrinter.ASTPrinter().print(key), "upvalue", self.interpreter.upvalue_refs[key])
+                print("Resolver end ---------------")
+                print()
+            self.analysis.analyse(statements)
+            self.purity.analyse(statements)
+            if verbose:
+                print("Analysis output ------------")
+                print(self.analysis.report())
+                print(self.purity.report())
+                print("Analysis end ---------------")
+                print()
+        return statements
@@ -0,0 +1,125 @@
+from typing import Callable, Dict, Tuple, TYPE_CHECKING
+
+from loxlist import LoxList
+from loxnative import NativeClass, NativeObject, check_callable, stringify
+
+if TYPE_CHECKING:
+    import loxinterpreter
+
+
+class BoolKey:
+    """ Key standing for true or false in map entries
+        Python takes True for 1 and False for 0 as dict keys, Lox keeps them apart """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+    def __reduce__(self) -> Tuple[Callable, Tuple[bool]]:
+        """ Pickle as the shared key of value """
+        return to_key, (self.value,)
+
+
+bool_keys: Dict[bool, BoolKey] = {True: BoolKey(True), False: BoolKey(False)}
+
+
+def to_key(key: object) -> object:
+    """ Return entry key of Lox value key """
+    if type(key) is bool:
+        return bool_keys[key]
+    return key
+
+
+def from_key(key: object) -> object:
+    """ Return Lox value of entry key """
+    if type(key) is BoolKey:
+        return key.value
+    return key
+
+
+class LoxMap(NativeObject):
+    """ Lox map, a Python dict with methods called from lox
+        Keys compare as Interpreter.is_equal, instances by identity, except that
+        booleans and numbers are different keys. entries holds true and false as
+        BoolKey, see to_key and from_key """
+
+    __slots__ = ("entries",)
+
+    native_class: NativeClass = NativeClass("Map")
+
+    def __init__(self, entries: Dict[object, object] = None) -> None:
+        if entries is None:
+            entries = dict()
+        self.entries = entries
+
+    def __str__(self) -> str:
+        """ Return map as string """
+        return "{" + ", ".join(f"{stringify(from_key(key))}: {stringify(value)}"
+                               for key, value in self.entries.items()) + "}"
+
+
+methods: NativeClass = LoxMap.native_class
+
+
+@methods.native("get", 1)
+def get(lox_map: LoxMap, key: object) -> object:
+    """ Return value of key, nil if not found """
+    return lox_map.entries.get(to_key(key))
+
+
+@methods.native("set", 2)
+def set_entry(lox_map: LoxMap, key: object, value: object) -> object:
+    """ Add or replace value of key, return value """
+    lox_map.entries[to_key(key)] = value
+    return value
+
+
+@methods.native("has", 1)
+def has(lox_map: LoxMap, key: object) -> bool:
+    """ Return true if key is in map """
+    return to_key(key) in lox_map.entries
+
+
+@methods.native("delete", 1)
+def delete(lox_map: LoxMap, key: object) -> bool:
+    """ Remove key, return true if it was in map """
+    key = to_key(key)
+    if key in lox_map.entries:
+        del lox_map.entries[key]
+        return True
+    return False
+
+
+@methods.native("size", 0)
+def size(lox_map: LoxMap) -> float:
+    """ Return number of keys """
+    return float(len(lox_map.entries))
+
+
+@methods.native("keys", 0)
+def keys(lox_map: LoxMap) -> LoxList:
+    """ Return list of keys in insertion order """
+    return LoxList([from_key(key) for key in lox_map.entries])
+
+
+@methods.native("values", 0)
+def values(lox_map: LoxMap) -> LoxList:
+    """ Return list of values in insertion order """
+    return LoxList(list(lox_map.entries.values()))
+
+
+@methods.native("forEach", 1, with_interpreter=True)
+def for_each(interpreter: 'loxinterpreter.Interpreter', lox_map: LoxMap, function: object) -> None:
+    """ Call function with each key and value """
+    call = check_callable(function, 2, "ForEach argument").call
+    for key, value in list(lox_map.entries.items()):
+        call(interpreter, [from_key(key), value])
+
+
+@methods.native("filter", 1, with_interpreter=True)
+def filter_entries(interpreter: 'loxinterpreter.Interpreter', lox_map: LoxMap, function: object) -> LoxMap:
+    """ Return new map of entries for which function of key and value is truthy """
+    call = check_callable(function, 2, "Filter argument").call
+    return LoxMap({key: value for key, value in list(lox_map.entries.items())
+                   if interpreter.is_true(call(interpreter, [from_key(key), value]))})
@@ -0,0 +1,158 @@
+from typing import List, Dict, Callable, Optional, TYPE_CHECKING
+
+from loxcallable import LoxCallable
+from loxerror import LoxNativeError
+from loxnumber import Number, to_string
+from loxsymbol import symbols
+
+if TYPE_CHECKING:
+    import loxinterpreter
+
+
+class NativeFunction(LoxCallable):
+    """ Python function callable from lox
+        Called straight with the argument values, errors are raised as LoxNativeError """
+
+    __slots__ = ("name", "function", "params", "with_interpreter", "instance", "direct")
+
+    def __init__(self, name: str, function: Callable, params: int, with_interpreter: bool = False,
+                 instance: object = None) -> None:
+        super().__init__(function)
+
+        self.name = name
+        self.function = function
+        self.params = params
+        self.with_interpreter = with_interpreter  # function takes interpreter as first argument
+        self.instance = instance  # bound object for methods of native objects used as values
+        self.direct: bool = not with_interpreter and instance is None  # can be called as function(*arguments)
+
+    def arity(self) -> int:
+        """ Returns no of parameters required """
+        return self.params
+
+    def bind(self, instance: 'NativeObject') -> 'NativeFunction':
+        """ Create bound method holding the object """
+        return NativeFunction(self.name, self.function, self.params, self.with_interpreter, instance)
+
+    def call(self, interpreter: 'loxinterpreter.Interpreter', arguments: List[object]) -> object:
+        """ Run the function """
+        if self.instance is not None:
+            return self.invoke(interpreter, self.instance, arguments)
+        if self.with_interpreter:
+            return self.function(interpreter, *arguments)
+        return self.function(*arguments)
+
+    def invoke(self, interpreter: 'loxinterpreter.Interpreter', instance: object, arguments: List[object]) -> object:
+        """ Run method of native object, the object is passed before the arguments """
+        if self.with_interpreter:
+            return self.function(interpreter, instance, *arguments)
+        return self.function(instance, *arguments)
+
+    def __str__(self) -> str:
+        """ Return function as string """
+        return "<native fn>"
+
+
+class NativeModule:
+    """ Named group of native functions and constants
+        Loaded into a script with load("name"), members read as module.member """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.members: Dict[int, object] = dict()  # keyed on symbol id of name
+
+    def native(self, name: str, params: int, with_interpreter: bool = False) -> Callable:
+        """ Decorator adding Python function to module as native function name with params arguments """
+        def register(function: Callable) -> Callable:
+            self.members[symbols.intern(name)] = NativeFunction(name, function, params, with_interpreter)
+            return function
+        return register
+
+    def constant(self, name: str, value: object) -> None:
+        """ Add constant to module """
+        self.members[symbols.intern(name)] = value
+
+    def get(self, name: int) -> object:
+        """ Return member with symbol id name """
+        if name in self.members:
+            return self.members[name]
+        raise LoxNativeError(f"Undefined member '{symbols.name(name)}' in module {self.name}.")
+
+    def __str__(self) -> str:
+        """ Return module as string """
+        return f"<module {self.name}>"
+
+
+class NativeClass:
+    """ Type of native objects such as lists, holds their methods """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.methods: Dict[int, NativeFunction] = dict()  # keyed on symbol id of name
+
+    def native(self, name: str, params: int, with_interpreter: bool = False) -> Callable:
+        """ Decorator adding Python function to class as method name with params arguments
+            The function gets the object as first argument, after the interpreter if with_interpreter """
+        def register(function: Callable) -> Callable:
+            self.methods[symbols.intern(name)] = NativeFunction(name, function, params, with_interpreter)
+            return function
+        return register
+
+    def find_method(self, name: int) -> Optional[NativeFunction]:
+        """ Return method with symbol id name or None """
+        return self.methods.get(name)
+
+
+class NativeObject:
+    """ Base class for values implemented in Python with methods called from lox """
+
+    __slots__ = ()
+
+    native_class: NativeClass
+
+
+modules: Dict[str, NativeModule] = dict()  # all modules, by name
+
+
+def module(name: str) -> NativeModule:
+    """ Return module name, creating it on first use """
+    if name not in modules:
+        modules[name] = NativeModule(name)
+    return modules[name]
+
+
+def stringify(value: object) -> str:
+    """ Return value as printed """
+    if type(value) is int:
+        return to_string(value)
+    return str(value)
+
+
+def check_number(value: object, name: str) -> Number:
+    """ Return value if it is a number """
+    if type(value) is not float and type(value) is not int:
+        raise LoxNativeError(f"{name} must be a number.")
+    return value
+
+
+def check_string(value: object, name: str) -> str:
+    """ Return value if it is a string """
+    if not isinstance(value, str):
+        raise LoxNativeError(f"{name} must be a string.")
+    return value
+
+
+def check_index(value: object, name: str) -> int:
+    """ Return value as int if it is a whole number """
+    if type(value) is int:
+        return value
+    if type(value) is not float or not value.is_integer():
+        raise LoxNativeError(f"{name} must be a whole number.")
+    return int(value)
+
+
+def check_callable(value: object, params: int, name: str) -> LoxCallable:
+    """ Return value if it can be called with params arguments """
+    if not isinstance(value, LoxCallable) or value.arity() != params:
+        raise LoxNativeError(f"{name} must be a function of {params} arguments.")
+    return value
@@ -0,0 +1,64 @@
+""" Lox numbers are IEEE doubles, held as Python int while integral and small
+    Every int is within MAX_INT, where int and float arithmetic agree exactly,
+    results outside it become float. Printing always shows the float """
+
+import math
+import operator
+from typing import Union, Dict, Callable
+
+from loxtoken import TokenType
+
+MAX_INT: int = 2 ** 53  # largest run of integers a double holds exactly
+
+Number = Union[int, float]
+
+
+def from_literal(text: str) -> Number:
+    """ Return value of number literal """
+    if text.isdigit():
+        value: int = int(text)
+        if value <= MAX_INT:
+            return value
+    return float(text)
+
+
+def is_number(value: object) -> bool:
+    """ Check value is a number, bool is not """
+    return type(value) is float or type(value) is int
+
+
+def multiply(left: int, right: int) -> Number:
+    """ Return product of ints, zero keeps the sign a double product has """
+    result: int = left * right
+    if result == 0 and (left < 0 or right < 0):
+        return -0.0
+    return result
+
+
+def divide(left: Number, right: Number) -> float:
+    """ Return quotient, dividing by zero gives infinity or nan as for doubles """
+    if right == 0:
+        if left == 0 or math.isnan(left):
+            return math.nan
+        return math.copysign(math.inf, left) * math.copysign(1.0, right)
+    return left / right
+
+
+def to_string(value: Number) -> str:
+    """ Return number as printed """
+    if type(value) is int:
+        return str(float(value))
+    return str(value)
+
+
+# Binary operators on two ints, results past MAX_INT still need normalising
+int_operations: Dict[TokenType, Callable] = {TokenType.PLUS: operator.add,
+                                             TokenType.MINUS: operator.sub,
+                                             TokenType.STAR: multiply,
+                                             TokenType.SLASH: divide,
+                                             TokenType.GREATER: operator.gt,
+                                             TokenType.GREATER_EQUAL: operator.ge,
+                                             TokenType.LESS: operator.lt,
+                                             TokenType.LESS_EQUAL: operator.le,
+                                             TokenType.EQUAL_EQUAL: operator.eq,
+                                             TokenType.BANG_EQUAL: operator.ne}
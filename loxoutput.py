@@ -0,0 +1,66 @@
+import io
+import sys
+from typing import List, Dict, Callable, BinaryIO, TextIO, Union
+
+from loxnative import stringify
+from loxnumber import to_string
+
+
+class Output:
+    """ Output of print statements, owned by the interpreter
+        Text is collected and written in batches to a binary stream, or a text stream
+        such as io.StringIO as it is. With no stream it goes to whatever sys.stdout is when flushed, in its encoding """
+
+    DEFAULT_BUFFER_SIZE: int = 64 * 1024  # characters held before writing
+
+    # Fast formatting of the common value types, anything else goes through stringify
+    formats: Dict[type, Callable[[object], str]] = {str: str,
+                                                    float: float.__repr__,
+                                                    int: to_string,
+                                                    bool: str,
+                                                    type(None): lambda value: "None"}
+
+    def __init__(self, stream: Union[BinaryIO, TextIO, None] = None, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 encoding: str = "utf-8") -> None:
+        self.stream = stream
+        self.text: bool = isinstance(stream, io.TextIOBase)  # stream takes str, not bytes
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+        self.parts: List[str] = []
+        self.size: int = 0  # characters in parts
+
+    def print(self, value: object) -> None:
+        """ Write value as printed, followed by new line """
+        formatter = Output.formats.get(type(value))
+        text: str = formatter(value) if formatter is not None else stringify(value)
+        self.parts.append(text + "\n")
+        self.size += len(text) + 1
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def write(self, text: str) -> None:
+        """ Write text as it is """
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Write out everything collected """
+        if not self.parts:
+            return
+        text: str = "".join(self.parts)
+        self.parts.clear()
+        self.size = 0
+        if self.text:
+            self.stream.write(text)
+            self.stream.flush()
+        elif self.stream is not None:
+            self.stream.write(text.encode(self.encoding))
+            self.stream.flush()
+        elif hasattr(sys.stdout, "buffer"):
+            sys.stdout.flush()  # keep order with text written through print()
+            sys.stdout.buffer.write(text.encode(sys.stdout.encoding, sys.stdout.errors or "strict"))
+            sys.stdout.buffer.flush()
+        else:
+            sys.stdout.write(text)
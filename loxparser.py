@@ -3,7 +3,7 @@ from typing import List, Optional, Union, Any
 import loxExprAST
 import loxStmtAST
 import loxtoken
-from loxerror import LoxParseError, raise_error
+from loxerror import ErrorReporter, LoxParseError, raise_error
 
 
 class Parser:
@@ -11,7 +11,8 @@ class Parser:
 
     tokentypes = loxtoken.TokenType
 
-    def __init__(self):
+    def __init__(self, reporter: Optional[ErrorReporter] = None):
+        self.reporter: ErrorReporter = reporter if reporter is not None else ErrorReporter()
         self.tokens: Optional[List[loxtoken.Token]] = None
         self.current: int = 0
         self.tokens: List[loxtoken.Token] = []
@@ -43,7 +44,7 @@ class Parser:
                 return self.var_declaration()
             return self.statement()
         except LoxParseError as err:
-            print(err)
+            self.reporter.report(err)
             self.synchronize()
             return None
 
@@ -113,15 +114,17 @@ class Parser:
     def while_stmt(self) -> loxStmtAST.While:
         """ whileStmt → "while" "(" expression ")" statement ; """
 
+        keyword: loxtoken.Token = self.previous()
         self.consume(Parser.tokentypes.LEFT_PAREN, "Expect '(' after 'while'.")
         condition: loxExprAST.Expr = self.expression()
         self.consume(Parser.tokentypes.RIGHT_PAREN, "Expect ')' after condition.")
         body: loxStmtAST.Block = self.statement()
-        return loxStmtAST.While(condition, body)
+        return loxStmtAST.While(keyword, condition, body)
 
     def for_stmt(self) -> loxStmtAST.Stmt:
         """ forStmt → "for" "(" ( varDecl | exprStmt | ";" ) expression? ";" expression? ")" statement ; """
 
+        keyword: loxtoken.Token = self.previous()
         self.consume(Parser.tokentypes.LEFT_PAREN, "Expect '(' after 'for'.")
         if self.match(Parser.tokentypes.SEMICOLON):
             initializer: Optional[loxStmtAST.Stmt] = None
@@ -143,7 +146,7 @@ class Parser:
             body = loxStmtAST.Block([body, loxStmtAST.Expression(increment)])
         if condition is None:
             condition = loxExprAST.Literal(True)
-        body = loxStmtAST.While(condition, body)
+        body = loxStmtAST.While(keyword, condition, body)
         if initializer is not None:
             body = loxStmtAST.Block([initializer, body])
         return body
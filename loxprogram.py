@@ -0,0 +1,147 @@
+import inspect
+from typing import Callable, Dict, List, Optional, TextIO, Tuple, TYPE_CHECKING
+
+import loxanalysis
+import loxerror
+import loxglobals
+import loxinterpreter
+import loxlist
+import loxmap
+import loxnumber
+import loxoutput
+import loxparser
+import loxresolver
+import loxrope
+import loxscanner
+import loxvector
+from loxerror import LoxCompileError
+from loxnative import NativeFunction, stringify
+from loxsymbol import symbols
+
+if TYPE_CHECKING:
+    import loximage
+    import loxStmtAST
+
+
+class Program:
+    """ Compiled Lox program, parsed, resolved and analysed once
+        The syntax tree and the side tables the passes filled in are never changed
+        after compiling, so a program can be shared and run any number of times,
+        also from several threads at once, each run in a new interpreter.
+        A program compiled against an image starts each run with the image's globals """
+
+    __slots__ = ("statements", "tables", "tail_calls_enabled", "image")
+
+    # Interpreter side tables filled in by the resolver and the analyses, read only when running
+    static_tables: Tuple[str, ...] = ("locals", "closures", "upvalue_refs", "tail_calls", "pure_functions",
+                                      "supers", "super_this", "direct_calls", "direct_methods")
+
+    def __init__(self, statements: List['loxStmtAST.Stmt'], compiler: loxinterpreter.Interpreter,
+                 image: Optional['loximage.Image'] = None) -> None:
+        self.statements: Tuple['loxStmtAST.Stmt', ...] = tuple(statements)
+        self.tables: Dict[str, object] = {name: getattr(compiler, name) for name in Program.static_tables}
+        self.tail_calls_enabled: bool = compiler.tail_calls_enabled
+        self.image = image
+
+    def interpreter(self, stdout: Optional[TextIO] = None, memoize: bool = True, max_steps: Optional[int] = None,
+                    on_slice: Optional[Callable[[], None]] = None,
+                    slice_steps: int = loxinterpreter.Interpreter.DEFAULT_SLICE,
+                    sandbox: bool = False) -> loxinterpreter.Interpreter:
+        """ Return new interpreter holding the tables of the program, and the globals of its image """
+        output = loxoutput.Output(stdout) if stdout is not None else None
+        interpreter = loxinterpreter.Interpreter(self.tail_calls_enabled, memoize, output, max_steps,
+                                                 on_slice, slice_steps, sandbox)
+        for name, table in self.tables.items():
+            setattr(interpreter, name, table)
+        # Direct methods are bound to the classes of one run, so each run has its own
+        copies: Dict[loxanalysis.DirectMethod, loxanalysis.DirectMethod] = \
+            {direct: loxanalysis.DirectMethod(declaration)
+             for declaration, direct in self.tables["direct_methods"].items()}
+        interpreter.direct_methods = {declaration: copies[direct]
+                                      for declaration, direct in self.tables["direct_methods"].items()}
+        interpreter.direct_calls = {call: copies[direct] for call, direct in self.tables["direct_calls"].items()}
+        if self.image is not None:
+            self.image.install(interpreter)
+        return interpreter
+
+    def run(self, globals: Optional[Dict[str, object]] = None, stdout: Optional[TextIO] = None,
+            memoize: bool = True, max_steps: Optional[int] = None, on_slice: Optional[Callable[[], None]] = None,
+            slice_steps: int = loxinterpreter.Interpreter.DEFAULT_SLICE, sandbox: bool = False) -> Dict[str, object]:
+        """ Run program with extra globals, print output to stdout (sys.stdout if None)
+            max_steps limits loop iterations and calls, on_slice is called every slice_steps
+            of them. A sandboxed run cannot touch files or stdin. Returns global variables
+            after the run as Python values, runtime errors are raised """
+        interpreter = self.interpreter(stdout, memoize, max_steps, on_slice, slice_steps, sandbox)
+        for name, value in (globals or {}).items():
+            interpreter.globals.define(symbols.intern(name), to_lox(value, name))
+        try:
+            for statement in self.statements:
+                interpreter.execute(statement)
+        finally:
+            interpreter.output.flush()
+        return {symbols.name(symbol_id): to_python(value) for symbol_id, value in interpreter.globals.values.items()
+                if symbol_id not in loxglobals.core.members}
+
+
+def compile(source: str, tail_calls: bool = True, image: Optional['loximage.Image'] = None) -> Program:
+    """ Return source compiled to a program, LoxCompileError if it has errors
+        With an image, source can use the globals of the image's prelude """
+    statements, compiler, _ = analyse(source, tail_calls, image)
+    return Program(statements, compiler, image)
+
+
+def analyse(source: str, tail_calls: bool = True, image: Optional['loximage.Image'] = None) \
+        -> Tuple[List['loxStmtAST.Stmt'], loxinterpreter.Interpreter,
+                 Tuple[loxanalysis.ClassHierarchyAnalysis, loxanalysis.PurityAnalysis]]:
+    """ Scan, parse, resolve and analyse source, LoxCompileError if it has errors
+        Returns the statements, the interpreter holding their tables and the analyses,
+        which later source can continue """
+    reporter = loxerror.ErrorReporter(echo=False)
+    tokens = loxscanner.Scanner(reporter).scan_tokens(source)
+    statements = loxparser.Parser(reporter).parse(tokens, 0)
+    if reporter.had_error:
+        raise LoxCompileError(reporter.errors)
+    compiler = loxinterpreter.Interpreter(tail_calls)
+    if image is not None:
+        analyses = image.extend(compiler)
+    else:
+        analyses = (loxanalysis.ClassHierarchyAnalysis(compiler), loxanalysis.PurityAnalysis(compiler))
+    loxresolver.Resolver(compiler, reporter).resolve(statements)
+    if reporter.had_error:
+        raise LoxCompileError(reporter.errors)
+    for analysis in analyses:
+        analysis.analyse(statements)
+    return statements, compiler, analyses
+
+
+def to_lox(value: object, name: str = "function") -> object:
+    """ Return Python value as Lox value
+        dicts become maps, lists and tuples lists, functions natives named name """
+    if isinstance(value, dict):
+        return loxmap.LoxMap({loxmap.to_key(key): to_lox(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return loxlist.LoxList([to_lox(item) for item in value])
+    if type(value) is int and not -loxnumber.MAX_INT <= value <= loxnumber.MAX_INT:
+        return float(value)
+    if inspect.isfunction(value) or inspect.ismethod(value):
+        return NativeFunction(name, value, len(inspect.signature(value).parameters))
+    return value
+
+
+def to_python(value: object) -> object:
+    """ Return Lox value as plain Python value, integral numbers as int
+        Functions, classes and instances are returned as they are """
+    if type(value) is float and value.is_integer() and -loxnumber.MAX_INT <= value <= loxnumber.MAX_INT:
+        return int(value)
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, loxmap.LoxMap):
+        return {key if isinstance(key, str) else stringify(loxmap.from_key(key)): to_python(item)
+                for key, item in value.entries.items()}
+    if isinstance(value, loxlist.LoxList):
+        return [to_python(item) for item in value.items]
+    if isinstance(value, loxvector.LoxVector):
+        return [to_python(item) for item in value.array.tolist()]
+    if isinstance(value, loxrope.LoxRope):
+        return str(value)
+    return value
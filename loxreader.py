@@ -0,0 +1,75 @@
+import sys
+from typing import Optional, TextIO
+
+from loxerror import LoxNativeError
+from loxnative import NativeClass, NativeObject, check_index
+
+
+class LoxReader(NativeObject):
+    """ Lox input stream, a buffered Python text file read on demand
+        Only the current line or chunk is held, so input of any size runs in constant memory """
+
+    __slots__ = ("stream", "owned")
+
+    native_class: NativeClass = NativeClass("Reader")
+
+    def __init__(self, stream: TextIO, owned: bool = True) -> None:
+        self.stream: Optional[TextIO] = stream
+        self.owned = owned  # close stream with the reader, not done for stdin
+
+    def check_open(self) -> TextIO:
+        """ Return stream if reader is not closed """
+        if self.stream is None:
+            raise LoxNativeError("Reader is closed.")
+        return self.stream
+
+    def __str__(self) -> str:
+        """ Return reader as string """
+        return "<reader>"
+
+
+def open_file(path: str) -> LoxReader:
+    """ Return reader of file """
+    try:
+        return LoxReader(open(path, 'r'))
+    except OSError as error:
+        raise LoxNativeError(f"Cannot open file: {error.strerror}.")
+
+
+def open_stdin() -> LoxReader:
+    """ Return reader of standard input """
+    return LoxReader(sys.stdin, False)
+
+
+methods: NativeClass = LoxReader.native_class
+
+
+@methods.native("readLine", 0)
+def read_line(reader: LoxReader) -> Optional[str]:
+    """ Return next line without new line, nil at end """
+    line: str = reader.check_open().readline()
+    if not line:
+        return None
+    if line[-1] == "\n":
+        return line[:-1]
+    return line
+
+
+@methods.native("read", 1)
+def read(reader: LoxReader, size: object) -> Optional[str]:
+    """ Return next chunk of at most size characters, nil at end """
+    count: int = check_index(size, "Size")
+    if count < 1:
+        raise LoxNativeError("Size must be positive.")
+    chunk: str = reader.check_open().read(count)
+    if not chunk:
+        return None
+    return chunk
+
+
+@methods.native("close", 0)
+def close(reader: LoxReader) -> None:
+    """ Close reader, later reads are errors """
+    if reader.stream is not None and reader.owned:
+        reader.stream.close()
+    reader.stream = None
@@ -1,11 +1,12 @@
 import enum
-from typing import List, Dict, Iterator, TypeVar, Generic, Any
+from typing import List, Dict, Iterator, TypeVar, Generic, Any, Tuple, Optional
 
-from loxerror import LoxError, raise_error
-from loxtoken import Token
+from loxerror import ErrorReporter, LoxError, raise_error
+from loxtoken import Token, TokenType
 import loxExprAST
 import loxStmtAST
 import loxinterpreter
+import loxsymbol
 
 T = TypeVar('T')
 
@@ -13,14 +14,17 @@ T = TypeVar('T')
 # noinspection PyArgumentList
 class Resolver:
     FunctionType = enum.Enum('FunctionType', 'NONE FUNCTION INITIALIZER METHOD')
-    ClassType = enum.Enum('ClassType', 'NONE CLASS')
+    ClassType = enum.Enum('ClassType', 'NONE CLASS SUBCLASS')
 
-    def __init__(self, interpreter: loxinterpreter.Interpreter):
+    def __init__(self, interpreter: loxinterpreter.Interpreter, reporter: Optional[ErrorReporter] = None):
 
-        self.interpreter = interpreter
-        self.scopes: Stack[Dict[str, bool]] = Stack()
+        self.interpreter = interpreter  # receives the side tables
+        self.reporter: ErrorReporter = reporter if reporter is not None else ErrorReporter()
+        self.scopes: Stack[Dict[int, bool]] = Stack()  # keyed on symbol id of name
         self.current_function: Resolver.FunctionType = Resolver.FunctionType.NONE
         self.current_class: Resolver.ClassType = Resolver.ClassType.NONE
+        self.current_supers: List[loxExprAST.Super] = []  # super expressions in current class
+        self.functions: Stack[Captures] = Stack()  # functions being resolved, innermost on top
 
     # ---------------------------------------------------------------------------------
 
@@ -32,28 +36,30 @@ class Resolver:
 
     def visit_class_stmt(self, stmt: loxStmtAST.Class) -> None:
         enclosing_class = self.current_class
+        enclosing_supers = self.current_supers
         self.current_class = Resolver.ClassType.CLASS
+        self.current_supers = []
         self.declare(stmt.name)
         self.define(stmt.name)
-        if stmt.superclass is not None and stmt.name.lexeme == stmt.superclass.name.lexeme:
+        if stmt.superclass is not None and stmt.name.symbol_id == stmt.superclass.name.symbol_id:
             raise_error(LoxError, stmt.superclass.name, "A class cannot inherit from itself.")
         if stmt.superclass is not None:
+            self.current_class = Resolver.ClassType.SUBCLASS
             self.resolve_expr(stmt.superclass)
         if stmt.superclass is not None:
             self.begin_scope()
-            self.scopes.peek()["super"] = True
-        self.begin_scope()
-        self.scopes.peek()["this"] = True
+            self.scopes.peek()[loxsymbol.SUPER] = True
         for method in stmt.methods:
-            if method.name.lexeme == "init":
+            if method.name.symbol_id == loxsymbol.INIT:
                 declaration: Resolver.FunctionType = Resolver.FunctionType.INITIALIZER
             else:
                 declaration = Resolver.FunctionType.METHOD
             self.resolve_function(method, declaration)
-        self.end_scope()
         if stmt.superclass is not None:
             self.end_scope()
+        self.interpreter.resolve_supers(stmt, self.current_supers)
         self.current_class = enclosing_class
+        self.current_supers = enclosing_supers
         return None
 
     def visit_var_stmt(self, stmt: loxStmtAST.Var) -> None:
@@ -93,6 +99,8 @@ class Resolver:
             if self.current_function == Resolver.FunctionType.INITIALIZER:
                 raise_error(LoxError, stmt.keyword, "Cannot return a value from an initializer.")
             self.resolve_expr(stmt.value)
+            if isinstance(stmt.value, loxExprAST.Call):
+                self.interpreter.resolve_tail_call(stmt)
         return None
 
     def visit_expression_stmt(self, stmt: loxStmtAST.Expression) -> None:
@@ -100,7 +108,7 @@ class Resolver:
         return None
 
     def visit_variable_expr(self, expr: loxExprAST.Variable) -> None:
-        if not self.scopes.is_empty() and self.scopes.peek().get(expr.name.lexeme) is False:
+        if not self.scopes.is_empty() and self.scopes.peek().get(expr.name.symbol_id) is False:
             raise_error(LoxError, expr.name, "Cannot read local variable in its own initializer.")
         self.resolve_local(expr, expr.name)
         return None
@@ -126,7 +134,16 @@ class Resolver:
         return None
 
     def visit_super_expr(self, expr: loxExprAST.Super) -> None:
+        if self.current_class == Resolver.ClassType.NONE:
+            raise_error(LoxError, expr.keyword, "Cannot use 'super' outside of a class.")
+        elif self.current_class != Resolver.ClassType.SUBCLASS:
+            raise_error(LoxError, expr.keyword, "Cannot use 'super' in a class with no superclass.")
+        self.current_supers.append(expr)
         self.resolve_local(expr, expr.keyword)
+        # 'this' for the call is resolved through its own expression
+        this_expr = loxExprAST.This(Token(TokenType.THIS, "this", None, expr.keyword.line))
+        self.resolve_local(this_expr, this_expr.keyword)
+        self.interpreter.resolve_super_this(expr, this_expr)
         return None
 
     def visit_grouping_expr(self, expr: loxExprAST.Grouping) -> None:
@@ -166,7 +183,7 @@ class Resolver:
             for stmt in stmts:
                 self.resolve_stmt(stmt)
         except LoxError as error:
-            print(error)
+            self.reporter.report(error)
 
     def resolve_stmt(self, stmt: loxStmtAST.Stmt) -> None:
         """ Resolve statemnt """
@@ -177,26 +194,57 @@ class Resolver:
         expr.accept(self)
 
     def resolve_local(self, expr: loxExprAST.Expr, name: Token) -> None:
-        """ Resolve variable. Send depth to interpreter to store """
+        """ Resolve variable. Send depth to interpreter to store
+            Variables of enclosing functions are captured as upvalues """
+        local_scopes: int = self.scopes.size()
+        if not self.functions.is_empty():
+            local_scopes -= self.functions.peek().base
         pos = 0
         for scope in self.scopes:
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, pos)
+            if name.symbol_id in scope:
+                if pos < local_scopes:
+                    self.interpreter.resolve(expr, pos, self.slot(scope, name.symbol_id))
+                else:
+                    self.interpreter.resolve_upvalue(expr, self.resolve_upvalue(self.functions.size(), name.symbol_id))
                 return
             pos += 1
         # Not found. Assume it is global.
 
+    def resolve_upvalue(self, level: int, name: int) -> int:
+        """ Capture name in function at level (1 is outermost) and return its upvalue index
+            Looks in the scopes of the enclosing code first, then captures it there """
+        function: Captures = self.functions.get(self.functions.size() - level + 1)
+        outer_base: int = self.functions.get(self.functions.size() - level + 2).base if level > 1 else 0
+        depth = 0
+        for index in range(function.base - 1, outer_base - 1, -1):
+            scope: Dict[int, bool] = self.scopes.get(self.scopes.size() - index)
+            if name in scope:
+                return function.add(True, depth, self.slot(scope, name))
+            depth += 1
+        return function.add(False, self.resolve_upvalue(level - 1, name), 0)
+
+    @staticmethod
+    def slot(scope: Dict[int, bool], name: int) -> int:
+        """ Return slot of name in its environment
+            Variables are defined at runtime in the order they are declared in scope """
+        return list(scope).index(name)
+
     def resolve_function(self, funct: loxStmtAST.Function, functype: 'Resolver.FunctionType') -> None:
         """ Resolve function """
         enclosing_function: Resolver.FunctionType = self.current_function
         self.current_function = functype
+        self.functions.push(Captures(self.scopes.size()))
         self.begin_scope()
+        if functype in (Resolver.FunctionType.METHOD, Resolver.FunctionType.INITIALIZER):
+            # 'this' lives in the method's own call environment (see LoxFunction.invoke)
+            self.scopes.peek()[loxsymbol.THIS] = True
         param: Token
         for param in funct.params:
             self.declare(param)
             self.define(param)
         self.resolve(funct.body)
         self.end_scope()
+        self.interpreter.resolve_closure(funct, self.functions.pop().captures)
         self.current_function = enclosing_function
 
     def begin_scope(self):
@@ -211,15 +259,32 @@ class Resolver:
         """ Declare variable. Set value to False """
         if self.scopes.is_empty():
             return None
-        if name.lexeme in self.scopes.peek():
+        if name.symbol_id in self.scopes.peek():
             raise_error(LoxError, name, "Variable with this name already declared in this scope.")
-        self.scopes.peek()[name.lexeme] = False
+        self.scopes.peek()[name.symbol_id] = False
 
     def define(self, name: Token):
         """ Define variable. Set value to True """
         if self.scopes.is_empty():
             return None
-        self.scopes.peek()[name.lexeme] = True
+        self.scopes.peek()[name.symbol_id] = True
+
+
+class Captures:
+    """ Variables captured by a function being resolved
+        Each capture is (is_local, index, slot): a variable index environments out from where
+        the function is created, or upvalue index of the enclosing function (slot unused) """
+
+    def __init__(self, base: int) -> None:
+        self.base = base  # position of the function's own scope in the scope stack
+        self.captures: List[Tuple[bool, int, int]] = []
+
+    def add(self, is_local: bool, index: int, slot: int) -> int:
+        """ Add capture if new and return its upvalue index """
+        capture: Tuple[bool, int, int] = (is_local, index, slot)
+        if capture not in self.captures:
+            self.captures.append(capture)
+        return self.captures.index(capture)
 
 
 class Stack(Generic[T]):
@@ -0,0 +1,53 @@
+from typing import List, Union
+
+
+MIN_LENGTH: int = 256  # shorter concatenations stay plain strings
+
+
+class LoxRope:
+    """ Lox string built by concatenation, kept as a list of pieces
+        s + piece appends to the pieces of s when s is the latest rope built on them,
+        so building a string in a loop is linear. Flattened to a str on demand and cached.
+        Compares and hashes as its str, so is_equal and map keys are unchanged """
+
+    __slots__ = ("pieces", "count", "flat")
+
+    def __init__(self, pieces: List[str], count: int) -> None:
+        self.pieces = pieces  # may be shared with longer ropes built from this one
+        self.count = count  # number of pieces in this rope
+        self.flat: Union[str, None] = None
+
+    def __str__(self) -> str:
+        """ Return rope as flat string """
+        if self.flat is None:
+            self.flat = "".join(self.pieces[:self.count])
+        return self.flat
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, LoxRope)):
+            return str(self) == str(other)
+        return False
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
+def concat(left: Union[str, LoxRope], right: Union[str, LoxRope]) -> Union[str, LoxRope]:
+    """ Return left + right, as a rope if long enough """
+    if type(left) is LoxRope:
+        pieces: List[str] = left.pieces
+        if len(pieces) != left.count:  # pieces were extended by another rope, copy ours
+            pieces = pieces[:left.count]
+    elif len(left) + len(right if type(right) is str else str(right)) < MIN_LENGTH:
+        return left + str(right)
+    else:
+        pieces = [left]
+    pieces.append(str(right))
+    return LoxRope(pieces, len(pieces))
+
+
+def flatten(value: object) -> object:
+    """ Return value with rope as str """
+    if type(value) is LoxRope:
+        return str(value)
+    return value
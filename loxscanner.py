@@ -1,7 +1,8 @@
 from typing import List, Dict, Optional
 
+import loxnumber
 import loxtoken
-from loxerror import LoxError, raise_error
+from loxerror import ErrorReporter, LoxError, raise_error
 
 
 class Scanner:
@@ -16,8 +17,9 @@ class Scanner:
                                                                        "if", "nil", "or", "print", "return", "super",
                                                                        "this", "true", "var", "while"])
 
-    def __init__(self) -> None:
+    def __init__(self, reporter: Optional[ErrorReporter] = None) -> None:
 
+        self.reporter: ErrorReporter = reporter if reporter is not None else ErrorReporter()
         self.source: str = ""  # source text
         self.tokens: List[loxtoken.Token] = list()  # output list of tokens
         self.start: int = 0  # offset of first char in current token
@@ -35,7 +37,10 @@ class Scanner:
         self.current = 0
         while not self.is_end():
             self.start = self.current
-            self.scan_token()
+            try:
+                self.scan_token()
+            except LoxError as error:
+                self.reporter.report(error)
         self.tokens.append(loxtoken.Token(Scanner.token_types.EOF, "", None, self.line))
         return self.tokens
 
@@ -126,7 +131,7 @@ class Scanner:
             self.get_next()
         while self.peek().isdigit() and not self.is_end():
             self.get_next()
-        value: float = float(self.source[self.start: self.current])
+        value: loxnumber.Number = loxnumber.from_literal(self.source[self.start: self.current])
         self.add_token(Scanner.token_types.NUMBER, value, self.line)
 
     @staticmethod
@@ -0,0 +1,66 @@
+import io
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import loxinterpreter
+import loxprogram
+
+
+class RoundRobin:
+    """ Time slices Lox programs in one process
+        Every program runs in its own thread, but only the one whose turn it is runs.
+        At the end of each fuel slice it hands the turn to the next program, so a long
+        program cannot hold up the others """
+
+    def __init__(self, slice_steps: int = loxinterpreter.Interpreter.DEFAULT_SLICE) -> None:
+        self.slice_steps = slice_steps
+        self.turns: Deque[int] = deque()  # programs waiting to run, the one running first
+        self.condition = threading.Condition()
+        self.switches: int = 0  # turns handed over
+
+    def wait_turn(self, number: int) -> None:
+        """ Block until it is the turn of program number """
+        with self.condition:
+            self.condition.wait_for(lambda: self.turns[0] == number)
+
+    def next_turn(self, number: int) -> None:
+        """ Hand the turn on and wait for the next one, called at the end of a slice """
+        with self.condition:
+            self.turns.rotate(-1)
+            self.switches += 1
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: self.turns[0] == number)
+
+    def finish(self, number: int) -> None:
+        """ Take program number out of the turns """
+        with self.condition:
+            self.turns.remove(number)
+            self.condition.notify_all()
+
+    def run(self, jobs: List[Tuple[loxprogram.Program, Dict[str, object]]],
+            max_steps: Optional[int] = None) -> List[Tuple[str, object]]:
+        """ Run each program with its globals, taking turns
+            Returns the output of each and its globals, or the error that stopped it """
+        results: List[Tuple[str, object]] = [("", None)] * len(jobs)
+        self.turns = deque(range(len(jobs)))
+
+        def run_job(number: int) -> None:
+            program, globals = jobs[number]
+            stdout = io.StringIO()
+            self.wait_turn(number)
+            try:
+                result: object = program.run(globals, stdout, max_steps=max_steps, slice_steps=self.slice_steps,
+                                             on_slice=lambda: self.next_turn(number))
+            except RuntimeError as error:
+                result = error
+            finally:
+                self.finish(number)
+            results[number] = (stdout.getvalue(), result)
+
+        threads = [threading.Thread(target=run_job, args=(number,)) for number in range(len(jobs))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
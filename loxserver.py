@@ -0,0 +1,257 @@
+""" Lox execution server
+    Clients send one JSON request per line over a Unix socket or localhost TCP:
+        {"id": 1, "source": "print 1;", "globals": {...}, "timeout": 2, "max_steps": 100000}
+    and get back the printed output as it is flushed, then a final status:
+        {"id": 1, "stdout": "1.0\\n"}
+        {"id": 1, "status": "ok", "result": ..., "elapsed": 3.1}
+    status is ok, compile_error, error, timeout, memory or crashed. result is the value of
+    the global variable result, if the program sets one.
+    Programs run sandboxed: no openFile or stdin, no io module and no vector.fromFile.
+
+    Requests run in a pool of worker processes, each with its modules loaded and a cache of
+    compiled programs keyed by the hash of their source. A worker over its time limit is
+    killed and replaced, memory is limited per worker process. Interned names are never
+    freed, so a worker whose symbol table passes --max-symbols is replaced as well.
+
+    python loxserver.py (--socket path | --port port) [--workers n] [--timeout s]
+                        [--max-steps n] [--max-memory mb] [--max-symbols n] """
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+from typing import Dict, Optional, TextIO
+
+import loxprogram
+from loxerror import LoxCompileError, LoxRuntimeError
+from loxnative import stringify
+from loxsymbol import symbols
+
+MAX_REQUEST: int = 1024 * 1024  # longest request line, in bytes
+
+
+class Worker:
+    """ Worker process running one request at a time """
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        self.process = process
+
+    @classmethod
+    async def start(cls, max_memory: int, max_symbols: int) -> 'Worker':
+        """ Start worker process, return when it is ready for requests """
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), "--worker", "--max-memory", str(max_memory),
+            "--max-symbols", str(max_symbols),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, limit=MAX_REQUEST)
+        await process.stdout.readline()
+        return cls(process)
+
+    async def run(self, request: Dict[str, object], send) -> Dict[str, object]:
+        """ Run request, passing output messages to send, return final message """
+        self.process.stdin.write(json.dumps(request).encode() + b"\n")
+        await self.process.stdin.drain()
+        while True:
+            line: bytes = await self.process.stdout.readline()
+            if not line:
+                return {"status": "crashed", "error": "Worker stopped."}
+            message = json.loads(line)
+            if "status" in message:
+                return message
+            await send(message)
+
+    async def kill(self) -> None:
+        """ Stop worker process """
+        if self.process.returncode is None:
+            self.process.kill()
+        await self.process.wait()
+
+
+class Server:
+    """ Accepts connections and hands their requests to idle workers """
+
+    def __init__(self, workers: int, timeout: float, max_steps: int, max_memory: int, max_symbols: int) -> None:
+        self.workers = workers
+        self.timeout = timeout  # seconds, requests may ask for less
+        self.max_steps = max_steps  # loop iterations and calls, requests may ask for less
+        self.max_memory = max_memory  # MB of address space per worker, 0 for no limit
+        self.max_symbols = max_symbols  # interned names after which a worker is replaced
+        self.idle: asyncio.Queue = asyncio.Queue()
+
+    async def start(self) -> None:
+        """ Start worker processes """
+        for _ in range(self.workers):
+            self.idle.put_nowait(await Worker.start(self.max_memory, self.max_symbols))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """ Serve requests of one connection, in order """
+        async def send(message: Dict[str, object]) -> None:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line: bytes = await reader.readline()
+                except ValueError:
+                    await send({"status": "error", "error": "Request too long."})
+                    break
+                if not line:
+                    break
+                request: object = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict) or not isinstance(request.get("source"), str):
+                        raise ValueError("Request needs a source string.")
+                    request["timeout"] = min(float(request.get("timeout", self.timeout)), self.timeout)
+                    request["max_steps"] = min(int(request.get("max_steps", self.max_steps)), self.max_steps)
+                    if not request["timeout"] > 0 or request["max_steps"] < 0:
+                        raise ValueError("Timeout must be positive, max_steps not negative.")
+                    if not isinstance(request.get("globals") or {}, dict):
+                        raise ValueError("Globals must be an object.")
+                except (ValueError, TypeError, OverflowError) as error:
+                    await send({"id": request.get("id") if isinstance(request, dict) else None,
+                                "status": "error", "error": str(error)})
+                    continue
+                await self.execute(request, send)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def execute(self, request: Dict[str, object], send) -> None:
+        """ Run request on an idle worker within its time limit
+            Its timeout and max_steps are checked and capped by handle """
+        request_id = request.get("id")
+        timeout: float = request["timeout"]
+        job = {"source": request["source"], "globals": request.get("globals") or {},
+               "max_steps": request["max_steps"]}
+
+        async def send_output(message: Dict[str, object]) -> None:
+            await send({"id": request_id, **message})
+
+        worker: Worker = await self.idle.get()
+        start: float = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(worker.run(job, send_output), timeout)
+        except asyncio.TimeoutError:
+            result = {"status": "timeout", "error": f"Time limit of {timeout} s exceeded."}
+        except BaseException:
+            await worker.kill()
+            self.idle.put_nowait(await Worker.start(self.max_memory, self.max_symbols))
+            raise
+        result["elapsed"] = round((time.perf_counter() - start) * 1000, 3)
+        # A worker whose symbol table grew too large retires after answering
+        if result.pop("retire", False) or result["status"] in ("timeout", "crashed", "memory"):
+            await worker.kill()
+            worker = await Worker.start(self.max_memory, self.max_symbols)
+        self.idle.put_nowait(worker)
+        await send({"id": request_id, **result})
+
+
+class OutputStream(io.TextIOBase):
+    """ Text stream sending what the program prints to the server as messages """
+
+    def __init__(self, channel: TextIO) -> None:
+        super().__init__()
+        self.channel = channel
+
+    def write(self, text: str) -> int:
+        """ Send text """
+        self.channel.write(json.dumps({"stdout": text}) + "\n")
+        return len(text)
+
+    def flush(self) -> None:
+        """ Send now """
+        self.channel.flush()
+
+
+def run_worker(max_memory: int, max_symbols: int) -> None:
+    """ Worker process: run requests read from stdin, messages to stdout
+        Anything else printed goes to stderr. Every name in every program stays in the
+        process wide symbol table, so past max_symbols the worker asks to be replaced
+        and stops """
+    if max_memory:
+        limit: int = max_memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    channel: TextIO = sys.stdout
+    sys.stdout = sys.stderr
+    programs: collections.OrderedDict = collections.OrderedDict()  # compiled programs by source hash
+    channel.write(json.dumps({"ready": True}) + "\n")
+    channel.flush()
+    for line in sys.stdin:
+        request = json.loads(line)
+        key: str = hashlib.sha256(request["source"].encode()).hexdigest()
+        message: Dict[str, object]
+        try:
+            program: Optional[loxprogram.Program] = programs.get(key)
+            if program is None:
+                program = loxprogram.compile(request["source"])
+                programs[key] = program
+                if len(programs) > 256:
+                    programs.popitem(last=False)
+            else:
+                programs.move_to_end(key)
+            results = program.run(globals=request["globals"], stdout=OutputStream(channel),
+                                  max_steps=request["max_steps"], sandbox=True)
+            message = {"status": "ok", "result": results.get("result")}
+        except LoxCompileError as error:
+            message = {"status": "compile_error", "error": str(error)}
+        except (LoxRuntimeError, RecursionError) as error:
+            message = {"status": "error", "error": str(error)}
+        except MemoryError:
+            message = {"status": "memory", "error": "Memory limit exceeded."}
+        except Exception as error:  # from a native or to_python, the worker carries on
+            message = {"status": "error", "error": f"{type(error).__name__}: {error}"}
+        retire: bool = len(symbols.names) > max_symbols
+        if retire:
+            message["retire"] = True
+        channel.write(json.dumps(message, default=stringify) + "\n")
+        channel.flush()
+        if retire:
+            break
+
+
+async def serve(options: argparse.Namespace) -> None:
+    """ Run server until cancelled """
+    server = Server(options.workers, options.timeout, options.max_steps, options.max_memory, options.max_symbols)
+    await server.start()
+    if options.socket:
+        listener = await asyncio.start_unix_server(server.handle, options.socket, limit=MAX_REQUEST)
+    else:
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", options.port, limit=MAX_REQUEST)
+    print(f"Serving on {options.socket or options.port} with {options.workers} workers", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main() -> None:
+    """ Main function """
+    parser = argparse.ArgumentParser(description="Lox execution server")
+    parser.add_argument("--socket", help="Unix socket path")
+    parser.add_argument("--port", type=int, help="localhost TCP port")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds per request")
+    parser.add_argument("--max-steps", type=int, default=10_000_000, help="loop iterations and calls per request")
+    parser.add_argument("--max-memory", type=int, default=512, help="MB per worker, 0 for no limit")
+    parser.add_argument("--max-symbols", type=int, default=100_000, help="interned names before a worker is replaced")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if options.worker:
+        run_worker(options.max_memory, options.max_symbols)
+    elif not options.socket and options.port is None:
+        parser.error("one of --socket or --port is required")
+    else:
+        try:
+            asyncio.run(serve(options))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
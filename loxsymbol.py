@@ -0,0 +1,39 @@
+import threading
+from typing import Dict, List
+
+
+class SymbolTable:
+    """ Interned identifiers, each given a small integer id
+        Ids key resolver scopes, global variables, fields and methods, so names are
+        compared as ints and every occurrence of a name shares one string.
+        Names are never removed, as compiled programs and native modules keep their ids, so
+        the table grows with every new name compiled. Processes compiling untrusted source
+        for long should be replaced once it is large, as loxserver.py does with --max-symbols """
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = dict()
+        self.names: List[str] = []
+        self.lock = threading.Lock()  # ids are only added, but adding must not race
+
+    def intern(self, name: str) -> int:
+        """ Return id of name, adding it if new """
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            with self.lock:
+                symbol_id = self.ids.get(name)
+                if symbol_id is None:
+                    symbol_id = len(self.names)
+                    self.names.append(name)
+                    self.ids[name] = symbol_id
+        return symbol_id
+
+    def name(self, symbol_id: int) -> str:
+        """ Return name of id """
+        return self.names[symbol_id]
+
+
+symbols: SymbolTable = SymbolTable()  # shared by every scanner and interpreter
+
+THIS: int = symbols.intern("this")
+SUPER: int = symbols.intern("super")
+INIT: int = symbols.intern("init")
@@ -2,6 +2,8 @@ from typing import List, Dict, Optional
 
 import enum
 
+from loxsymbol import symbols
+
 
 class TokenType(enum.Enum):
     """ Enumeration class for all tokens/keywords
@@ -80,18 +82,24 @@ class TokenType(enum.Enum):
 class Token:
     """ Token class """
 
+    named_types = (TokenType.IDENTIFIER, TokenType.THIS, TokenType.SUPER)
+
     def __init__(self, tok_type: TokenType, lexeme: str, literal: object, line: int):
         self.tok_type = tok_type  # Token type
         self.lexeme = lexeme  # string from source
         self.literal = literal  # Token value
         self.line = line  # Line no in source
+        self.symbol_id: Optional[int] = None  # id of name in loxsymbol.symbols
+        if tok_type in Token.named_types:
+            self.symbol_id = symbols.intern(lexeme)
+            self.lexeme = symbols.name(self.symbol_id)  # one shared string per name
 
     def __str__(self) -> str:
         """ Used to print token """
         text: str = f'{self.tok_type.name} {self.lexeme}'
         if self.literal is None:
             text = f'{text} None '
-        elif isinstance(self.literal, float):
+        elif isinstance(self.literal, (int, float)):
             text = f'{text} {self.literal}'
 
         return f'Line: {self.line} - {text}'
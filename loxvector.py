@@ -0,0 +1,198 @@
+from typing import Dict, Callable
+
+from loxerror import LoxNativeError
+from loxlist import LoxList
+from loxnative import NativeClass, NativeModule, NativeObject, module, check_index, check_number, check_string
+from loxnumber import is_number
+from loxtoken import TokenType
+
+try:
+    import numpy
+except ImportError:  # vectors are optional, the vector module reports they are unavailable
+    numpy = None
+
+
+class LoxVector(NativeObject):
+    """ Lox vector of numbers, a NumPy array
+        Arithmetic and comparison operators work element-wise, numbers are broadcast """
+
+    __slots__ = ("array",)
+
+    native_class: NativeClass = NativeClass("Vector")
+
+    def __init__(self, array: 'numpy.ndarray') -> None:
+        self.array = array
+
+    def __str__(self) -> str:
+        """ Return vector as string """
+        return "[" + ", ".join(str(item) for item in self.array.tolist()) + "]"
+
+
+operators: Dict[TokenType, Callable] = dict()
+if numpy is not None:
+    operators = {TokenType.PLUS: numpy.add,
+                 TokenType.MINUS: numpy.subtract,
+                 TokenType.STAR: numpy.multiply,
+                 TokenType.SLASH: numpy.divide,
+                 TokenType.GREATER: numpy.greater,
+                 TokenType.GREATER_EQUAL: numpy.greater_equal,
+                 TokenType.LESS: numpy.less,
+                 TokenType.LESS_EQUAL: numpy.less_equal}
+
+
+def binary(operator: TokenType, left: object, right: object) -> LoxVector:
+    """ Apply operator to vector and vector or number
+        Called by Interpreter.visit_binary_expr when an operand is a vector """
+    if operator not in operators:
+        raise LoxNativeError("Operator not supported for vectors.")
+    operands = []
+    for operand in (left, right):
+        if isinstance(operand, LoxVector):
+            operands.append(operand.array)
+        elif is_number(operand):
+            operands.append(operand)
+        else:
+            raise LoxNativeError("Operands must be vectors or numbers.")
+    if isinstance(left, LoxVector) and isinstance(right, LoxVector) and len(left.array) != len(right.array):
+        raise LoxNativeError("Vectors must have the same length.")
+    try:
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return LoxVector(operators[operator](*operands))
+    except (TypeError, ValueError):  # such as subtracting vectors of bools
+        raise LoxNativeError("Operator not supported for these vectors.")
+
+
+def new_vector(values) -> LoxVector:
+    """ Return vector of float values """
+    if numpy is None:
+        raise LoxNativeError("Vectors need NumPy, which is not installed.")
+    return LoxVector(numpy.asarray(values, dtype=float))
+
+
+def check_vector(value: object, name: str) -> 'numpy.ndarray':
+    """ Return array of value if it is a vector """
+    if not isinstance(value, LoxVector):
+        raise LoxNativeError(f"{name} must be a vector.")
+    return value.array
+
+
+def scalar(value: object) -> object:
+    """ Return NumPy number as lox number or bool """
+    value = value.item()
+    if isinstance(value, bool):
+        return value
+    return float(value)
+
+
+# ---------------------------------------------------------------------------------
+# vector module, constructors
+
+vector_module: NativeModule = module("vector")
+
+
+@vector_module.native("range", 2)
+def vector_range(start: object, end: object) -> LoxVector:
+    """ Return vector of whole numbers from start up to end """
+    if numpy is None:
+        return new_vector(())
+    return new_vector(numpy.arange(check_index(start, "Start"), check_index(end, "End")))
+
+
+@vector_module.native("zeros", 1)
+def zeros(size: object) -> LoxVector:
+    """ Return vector of size zeros """
+    return new_vector([0.0] * max(check_index(size, "Size"), 0))
+
+
+@vector_module.native("fromList", 1)
+def from_list(lox_list: object) -> LoxVector:
+    """ Return vector of numbers in list """
+    if not isinstance(lox_list, LoxList):
+        raise LoxNativeError("Argument must be a list.")
+    return new_vector([check_number(item, "List item") for item in lox_list.items])
+
+
+@vector_module.native("fromFile", 1)
+def from_file(path: object) -> LoxVector:
+    """ Return vector of numbers in file, separated by commas or whitespace """
+    try:
+        with open(check_string(path, "Path"), 'r') as source_file:
+            text: str = source_file.read()
+    except OSError as error:
+        raise LoxNativeError(f"Cannot read file: {error.strerror}.")
+    try:
+        return new_vector([float(number) for number in text.replace(",", " ").split()])
+    except ValueError:
+        raise LoxNativeError("File must only contain numbers.")
+
+
+# ---------------------------------------------------------------------------------
+# vector methods, reductions
+
+methods: NativeClass = LoxVector.native_class
+
+
+@methods.native("length", 0)
+def length(vector: LoxVector) -> float:
+    """ Return number of elements """
+    return float(len(vector.array))
+
+
+@methods.native("get", 1)
+def get(vector: LoxVector, index: object) -> object:
+    """ Return element at index """
+    position: int = check_index(index, "Vector index")
+    if not 0 <= position < len(vector.array):
+        raise LoxNativeError("Vector index out of range.")
+    return scalar(vector.array[position])
+
+
+@methods.native("slice", 2)
+def slice_elements(vector: LoxVector, start: object, end: object) -> LoxVector:
+    """ Return new vector of elements from start up to end """
+    return LoxVector(vector.array[check_index(start, "Start"):check_index(end, "End")].copy())
+
+
+@methods.native("toList", 0)
+def to_list(vector: LoxVector) -> LoxList:
+    """ Return list of elements """
+    return LoxList([scalar(item) for item in vector.array])
+
+
+@methods.native("sum", 0)
+def sum_elements(vector: LoxVector) -> float:
+    """ Return total of elements, true counts as 1 """
+    return float(vector.array.sum())
+
+
+@methods.native("mean", 0)
+def mean(vector: LoxVector) -> float:
+    """ Return average of elements """
+    if len(vector.array) == 0:
+        raise LoxNativeError("Mean of empty vector.")
+    return float(vector.array.mean())
+
+
+@methods.native("min", 0)
+def min_element(vector: LoxVector) -> object:
+    """ Return smallest element """
+    if len(vector.array) == 0:
+        raise LoxNativeError("Min of empty vector.")
+    return scalar(vector.array.min())
+
+
+@methods.native("max", 0)
+def max_element(vector: LoxVector) -> object:
+    """ Return largest element """
+    if len(vector.array) == 0:
+        raise LoxNativeError("Max of empty vector.")
+    return scalar(vector.array.max())
+
+
+@methods.native("dot", 1)
+def dot(vector: LoxVector, other: object) -> float:
+    """ Return dot product with other vector """
+    array = check_vector(other, "Argument")
+    if len(vector.array) != len(array):
+        raise LoxNativeError("Vectors must have the same length.")
+    return float(numpy.dot(vector.array, array))
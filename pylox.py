@@ -1,7 +1,17 @@
-from typing import List
+from typing import List, Optional
 
 import sys
+import loximage
 import loxmain
+import loxprogram
+
+
+def compile(source: str, tail_calls: bool = True, image: Optional[loximage.Image] = None) -> loxprogram.Program:
+    """ Compile Lox source for embedding
+        program = pylox.compile(source); program.run(globals={...}, stdout=...)
+        With image = loximage.load(path) every run starts with the image's globals """
+
+    return loxprogram.compile(source, tail_calls, image)
 
 
 def main() -> None:
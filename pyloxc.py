@@ -0,0 +1,73 @@
+""" Thin client of loxdaemon.py
+    Takes the same arguments as pylox.py and hands them, the working directory and
+    its stdin, stdout and stderr to the daemon. Runs pylox.py itself when no daemon
+    is listening, or the one listening runs as another user. Imports nothing of Lox,
+    so it starts as fast as Python does """
+
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+from typing import Optional
+
+
+def private_directory() -> Optional[str]:
+    """ Return directory for the daemon socket that only this user can use
+        $XDG_RUNTIME_DIR, else /tmp/pylox-<uid> created with mode 0700. None if it
+        belongs to another user or others may use it """
+    directory: str = os.environ.get("XDG_RUNTIME_DIR", "")
+    try:
+        if not directory:
+            directory = f"/tmp/pylox-{os.getuid()}"
+            try:
+                os.mkdir(directory, 0o700)
+            except FileExistsError:
+                pass
+        info = os.lstat(directory)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        return None
+    return directory
+
+
+def socket_path() -> Optional[str]:
+    """ Return path of the daemon socket, PYLOX_SOCKET if set, None if there is no safe place """
+    if os.environ.get("PYLOX_SOCKET"):
+        return os.environ["PYLOX_SOCKET"]
+    directory: Optional[str] = private_directory()
+    return None if directory is None else os.path.join(directory, "pylox.sock")
+
+
+def peer_uid(connection: socket.socket) -> Optional[int]:
+    """ Return user id of the process at the other end of a Unix socket, None if unknown """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials: bytes = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", credentials)[1]  # pid, uid, gid
+
+
+def main() -> None:
+    """ Main function """
+    path: Optional[str] = socket_path()
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        if path is None or not hasattr(socket, "send_fds"):  # send_fds needs Python 3.9
+            raise OSError("no daemon")
+        connection.connect(path)
+        if peer_uid(connection) != os.getuid():  # never hand our stdio to another user
+            print(f"pyloxc: {path} is not a daemon of this user, running pylox.py", file=sys.stderr)
+            raise OSError("daemon of another user")
+    except OSError:
+        script: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pylox.py")
+        os.execv(sys.executable, [sys.executable, script] + sys.argv[1:])
+    request: bytes = json.dumps({"args": sys.argv[1:], "cwd": os.getcwd()}).encode()
+    socket.send_fds(connection, [request], [0, 1, 2])
+    reply: bytes = connection.makefile("rb").readline()
+    sys.exit(json.loads(reply)["status"] if reply else 1)
+
+
+if __name__ == '__main__':
+    main()